@@ -5,7 +5,7 @@ These extract data of the best and worst solutions (fitness) in the population a
 Where relevant, the highest and lowest of each metric in the population are also extracted.
 """
 from golf import Golf_Analyser
-import glob
+from game_log import game_files, read_games
 import os
 import numpy as np
 
@@ -20,14 +20,13 @@ def extract_mean_scores(dir_path, games_per_solution=10):
     Returns: A nested list containing the data for the best player, worst player and population average.
     """
     #Load the paths of each generation's game file from the relevant directory
-    files = glob.glob('%s/game_files/*.txt' % dir_path)
+    files = game_files(os.path.join(dir_path, 'game_files'))
     best_solution, worst_solution, pop_av = [],[],[]
 
     for game_file in files:
-        with open(game_file, "r") as f:
-            games = f.read().split('\n\n')[:-1]
+        games = list(read_games(game_file))
         #Extracts the scores from the games
-        all_scores = [Golf_Analyser.extract_scores(game + '\n') for game in games]
+        all_scores = [Golf_Analyser.extract_scores(game) for game in games]
         solution_scores = np.reshape(all_scores, (len(all_scores)//games_per_solution, games_per_solution, 2))
         
         mean_solution_scores = np.mean(np.amin(solution_scores, axis=2), axis=1)
@@ -48,15 +47,14 @@ def extract_mean_number_of_turns(dir_path, games_per_solution=10):
     Returns: A nested list containing the data for the best player, worst player and population highest, lowest and average.
     """
     #Load the paths of each generation's game file from the relevant directory
-    files = glob.glob('%s/game_files/*.txt' % dir_path)
+    files = game_files(os.path.join(dir_path, 'game_files'))
     best_solution, worst_solution, pop_av, highest, lowest = [],[],[], [], []
 
     for game_file in files:
-        with open(game_file, "r") as f:
-            games = f.read().split('\n\n')[:-1]
+        games = list(read_games(game_file))
         #Extracts the scores and number of turns from each file
-        all_scores = [Golf_Analyser.extract_scores(game + '\n') for game in games]
-        all_turns = [sum(Golf_Analyser.extract_number_of_turns(game + '\n')) for game in games]
+        all_scores = [Golf_Analyser.extract_scores(game) for game in games]
+        all_turns = [sum(Golf_Analyser.extract_number_of_turns(game)) for game in games]
 
         solution_scores = np.reshape(all_scores, (len(all_scores)//games_per_solution, games_per_solution, 2))
         solution_turns = np.sum(np.reshape(all_turns, (len(all_turns)//games_per_solution, games_per_solution)), axis=1)
@@ -84,15 +82,14 @@ def extract_mean_number_of_matches(dir_path, games_per_solution=10):
     Returns: A nested list containing the data for the best player, worst player and population highest, lowest and average.
     """
     #Load the paths of each generation's game file from the relevant directory
-    files = glob.glob('%s/game_files/*.txt' % dir_path)
+    files = game_files(os.path.join(dir_path, 'game_files'))
     best_solution, worst_solution, pop_av, highest, lowest = [],[],[], [], []
 
     for game_file in files:
-        with open(game_file, "r") as f:
-            games = f.read().split('\n\n')[:-1]
+        games = list(read_games(game_file))
         #Extracts the scores and number of matches from each file
-        all_scores = [Golf_Analyser.extract_scores(game + '\n') for game in games]
-        all_matches = [extract_matches_round(Golf_Analyser.extract_hands(game + '\n')) for game in games]
+        all_scores = [Golf_Analyser.extract_scores(game) for game in games]
+        all_matches = [extract_matches_round(Golf_Analyser.extract_hands(game)) for game in games]
 
         solution_scores = np.reshape(all_scores, (len(all_scores)//games_per_solution, games_per_solution, 2))
         solution_matches = np.reshape(all_matches, (len(all_matches)//games_per_solution, games_per_solution, 9, 2))
@@ -0,0 +1,482 @@
+"""
+---batch_golf.py---
+Contains the Batch_Golf class, a lockstep simulator that plays many rounds of Golf at once using numpy arrays,
+    as well as the vectorised policies (players) that it can be played with.
+Every round is held as a row of 2-D arrays; the deck permutations, hands, hidden masks, discard piles and turn pointers.
+Each step of the simulation advances all live rounds by one turn, rounds that have finished are masked out.
+Cards are represented by their index in the game state (0-53) as in compact_golf.
+"""
+from abc import ABC, abstractmethod
+import numpy as np
+
+from actions import Actions
+from compact_golf import NUM_CARDS, CARD_VALUES, CARD_SCORES, CARD_CHARS, HIDDEN_CHAR, COLUMN_SCORES
+from player import Golf_Player, Random_Golf_Player, Greedy_Golf_Player
+
+#Lookup tables as arrays to allow for fancy indexing
+VALUE_TABLE = np.array(CARD_VALUES, dtype=np.int8)
+SCORE_TABLE = np.array(CARD_SCORES, dtype=np.int8)
+#The number of distinct turn tokens, used to encode each turn as a single integer
+NUM_ACTIONS = 9
+
+
+class Batch_Golf():
+    """
+    Plays many rounds of the card game Golf at once in lockstep.
+    The rules followed are the same as Golf.play_round, including the termination of rounds that loop.
+    Attributes:
+        num_rounds (int): The number of concurrent rounds, N.
+        num_players (int): The number of players in each round, P.
+        rng (numpy.random.Generator): The random generator used to shuffle decks and turn cards face up.
+        dealt (numpy.ndarray): A (N, P, 6) int8 array of the hands dealt to the players at the start of the round.
+        deck (numpy.ndarray): A (N, 54) uint8 array of the deck of each round, the last card in the stock is the 'top' of the deck.
+        stock_len (numpy.ndarray): A (N,) array of the number of cards remaining in the stock of each round.
+        pile (numpy.ndarray): A (N, 54) uint8 array of the discard pile of each round, in the order the cards were discarded.
+        pile_len (numpy.ndarray): A (N,) array of the number of cards in the discard pile of each round.
+        hands (numpy.ndarray): A (N, P, 6) int8 array of the hands of the players.
+        hidden (numpy.ndarray): A (N, P, 6) boolean array which is True where the card in a hand is hidden.
+        turn (numpy.ndarray): A (N,) array of the position of the player whose turn it is.
+        live (numpy.ndarray): A (N,) boolean array which is True for rounds that have not yet finished.
+        terminated (numpy.ndarray): A (N,) boolean array which is True for rounds that were ended due to a loop.
+        num_turns (numpy.ndarray): A (N,) array of the number of turns taken in each round.
+    """
+
+    def __init__(self, num_rounds, num_players=2, rng=None):
+        self.num_rounds = num_rounds
+        self.num_players = num_players
+        self.rng = np.random.default_rng(rng)
+
+    @staticmethod
+    def random_decks(num_rounds, rng):
+        """
+        Generates a deck permutation for each round.
+        Args:
+            num_rounds (int): The number of decks to generate.
+            rng (numpy.random.Generator): The random generator used to shuffle the decks.
+        Returns: A (num_rounds, 54) uint8 array where each row is a shuffled deck.
+        """
+        return np.argsort(rng.random((num_rounds, NUM_CARDS)), axis=1).astype(np.uint8)
+
+    def reset(self, round_num=0, decks=None):
+        """
+        Deals the hands of every round and turns two cards face up in each hand.
+        Args:
+            round_num (int): The current round number. Determines which player goes first.
+            decks (numpy.ndarray): A (N, 54) array of the decks to play the rounds with.
+                Each deck is in the same order as those used by Compact_Golf, the last card being the 'top'.
+                If None, then new decks are generated with rng.
+        Returns: None
+        """
+        N, P = self.num_rounds, self.num_players
+        rows = np.arange(N)
+        if decks is None:
+            decks = self.random_decks(N, self.rng)
+        self.deck = np.array(decks, dtype=np.uint8).reshape((N, NUM_CARDS))
+
+        #Deal the hands from the top of the deck in the same order as Golf.play_round
+        dealt = self.deck[:, ::-1][:, :6*P].reshape((N, 6, P))
+        self.hands = np.ascontiguousarray(dealt.transpose(0, 2, 1)).astype(np.int8)
+        self.dealt = self.hands.copy()
+        self.stock_len = np.full(N, NUM_CARDS - 6*P - 1, dtype=np.int64)
+
+        #Turn two cards face up in each players hand
+        face_up = np.argsort(self.rng.random((N, P, 6)), axis=2)[:, :, :2]
+        self.hidden = np.ones((N, P, 6), dtype=bool)
+        np.put_along_axis(self.hidden, face_up, False, axis=2)
+
+        #Start the discard pile with the next card of the deck
+        self.pile = np.zeros((N, NUM_CARDS), dtype=np.uint8)
+        self.pile[:, 0] = self.deck[rows, self.stock_len]
+        self.pile_len = np.ones(N, dtype=np.int64)
+
+        self.turn = np.full(N, round_num % P, dtype=np.int64)
+        self.first_turn = self.turn.copy()
+        self.live = np.ones(N, dtype=bool)
+        self.terminated = np.zeros(N, dtype=bool)
+        self.num_turns = np.zeros(N, dtype=np.int64)
+        self.tokens = np.zeros((N, 64), dtype=np.int32)
+        self.initial_hidden = self.hidden.copy()
+
+    def discard_top(self, rows):
+        """
+        Returns the card on top of the discard pile of the given rounds.
+        Args:
+            rows (numpy.ndarray): The indexes of the rounds.
+        Returns: An array of card indexes.
+        """
+        return self.pile[rows, self.pile_len[rows]-1]
+
+    def get_states(self, rows):
+        """
+        Converts the current state of the given rounds into game states, from the perspective of the player whose turn it is.
+        Each row is identical to the list that would be produced by Golf.get_state.
+        Args:
+            rows (numpy.ndarray): The indexes of the rounds.
+        Returns: A (len(rows), 54) int8 array of game states.
+        """
+        R = len(rows)
+        states = np.full((R, NUM_CARDS), -1, dtype=np.int8)
+        local = np.arange(R)
+
+        #Cards in the discard pile
+        in_pile = np.arange(NUM_CARDS)[None, :] < self.pile_len[rows, None]
+        r, c = np.nonzero(in_pile)
+        states[r, self.pile[rows[r], c]] = -2
+
+        #Visible cards in the opponents hands, then in the players hand
+        hands, visible = self.hands[rows], ~self.hidden[rows]
+        seat = self.turn[rows]
+        for p in range(self.num_players):
+            r, i = np.nonzero(visible[:, p] & (seat != p)[:, None])
+            states[r, hands[r, p, i]] = -3
+        own_hand, own_visible = hands[local, seat], visible[local, seat]
+        r, i = np.nonzero(own_visible)
+        states[r, own_hand[r, i]] = i
+        return states
+
+    def play(self, players, round_num=0, decks=None, record_history=False):
+        """
+        Plays all rounds from the start until every round has finished.
+        Args:
+            players ([Batch_Policy]): The vectorised policies of each player, in order of position.
+            round_num (int): The current round number. Determines which player goes first.
+            decks (numpy.ndarray): A (N, 54) array of the decks to play the rounds with, None to generate new decks.
+            record_history (boolean): Whether the game history string of each round should be created.
+        Returns: A tuple containing a (N, P) array of the scores of each round and a list of game histories (or None).
+        """
+        self.reset(round_num, decks)
+        N, P = self.num_rounds, self.num_players
+
+        while True:
+            rows = np.nonzero(self.live)[0]
+            if len(rows) == 0:
+                break
+            seat = self.turn[rows]
+
+            #The round ends once a player starts their turn with all cards face up
+            finished = ~self.hidden[rows, seat].any(axis=1)
+            self.live[rows[finished]] = False
+            rows, seat = rows[~finished], seat[~finished]
+            if len(rows) == 0:
+                break
+            states = self.get_states(rows)
+
+            #Each player decides where to draw from in the rounds where it is their turn
+            from_deck = np.empty(len(rows), dtype=bool)
+            for p in range(P):
+                mask = seat == p
+                if mask.any():
+                    from_deck[mask] = players[p].choose_draw(self, rows[mask], states[mask])
+
+            deck_rows, pile_rows = rows[from_deck], rows[~from_deck]
+            drawn = np.empty(len(rows), dtype=np.int64)
+            self.stock_len[deck_rows] -= 1
+            drawn[from_deck] = self.deck[deck_rows, self.stock_len[deck_rows]]
+            self.pile_len[pile_rows] -= 1
+            drawn[~from_deck] = self.pile[pile_rows, self.pile_len[pile_rows]]
+
+            #Each player decides what card to discard
+            actions = np.empty(len(rows), dtype=np.int64)
+            for p in range(P):
+                mask = seat == p
+                if mask.any():
+                    actions[mask] = players[p].choose_discard(self, rows[mask], states[mask], drawn[mask])
+
+            #Exchange the drawn card with the card in the hand, or discard it
+            discarded = drawn.copy()
+            exchange = actions != Actions.DISCARD
+            ex_rows, ex_seat, ex_slot = rows[exchange], seat[exchange], actions[exchange]
+            discarded[exchange] = self.hands[ex_rows, ex_seat, ex_slot]
+            self.hands[ex_rows, ex_seat, ex_slot] = drawn[exchange]
+            self.hidden[ex_rows, ex_seat, ex_slot] = False
+            self.pile[rows, self.pile_len[rows]] = discarded
+            self.pile_len[rows] += 1
+
+            #Record each turn as a single integer token to detect loops
+            tokens = ((from_deck*NUM_CARDS + drawn)*NUM_ACTIONS + actions)*NUM_CARDS + discarded
+            t = self.num_turns[rows[0]]
+            if t >= self.tokens.shape[1]:
+                self.tokens = np.concatenate((self.tokens, np.zeros_like(self.tokens)), axis=1)
+            self.tokens[rows, t] = tokens
+            self.num_turns[rows] += 1
+            self.turn[rows] = (seat + 1) % P
+
+            #Check for cycles in the game
+            looped = (self.tokens[rows, :t+1] == tokens[:, None]).sum(axis=1) > 5
+            self.live[rows[looped]] = False
+            self.terminated[rows[looped]] = True
+            rows = rows[~looped]
+
+            #Recycle the stock if empty
+            empty = rows[self.stock_len[rows] == 0]
+            if len(empty):
+                self._recycle(empty)
+
+        scores = COLUMN_SCORES[self.hands[:, :, :3], self.hands[:, :, 3:]].sum(axis=2).astype(np.int64)
+        histories = self._histories(scores) if record_history else None
+        return scores, histories
+
+    def _recycle(self, rows):
+        """
+        Shuffles all but the top card of the discard pile to form the new stock of the given rounds.
+        Args:
+            rows (numpy.ndarray): The indexes of the rounds whose stock is empty.
+        Returns: None
+        """
+        new_len = self.pile_len[rows] - 1
+        #Random keys where cards outside of the pile are always sorted last
+        keys = self.rng.random((len(rows), NUM_CARDS))
+        keys[np.arange(NUM_CARDS)[None, :] >= new_len[:, None]] = np.inf
+        order = np.argsort(keys, axis=1)
+        self.deck[rows] = np.take_along_axis(self.pile[rows], order, axis=1)
+        self.stock_len[rows] = new_len
+        self.pile[rows, 0] = self.pile[rows, new_len]
+        self.pile_len[rows] = 1
+
+    def _histories(self, scores):
+        """
+        Creates the game history string of every round in the same format as Golf.play_round.
+        Must be called once all rounds have finished.
+        Args:
+            scores (numpy.ndarray): A (N, P) array of the final scores of each round.
+        Returns: A list of N game history strings.
+        """
+        histories = []
+        to_char = lambda c: CARD_CHARS[c]
+        for n in range(self.num_rounds):
+            history = str(self.num_players) + str(self.first_turn[n])
+            for p in range(self.num_players):
+                hidden = self.initial_hidden[n, p]
+                dealt = self.dealt[n, p].tolist()
+                history += "".join(HIDDEN_CHAR if hidden[i] else to_char(dealt[i]) for i in range(6))
+            history += '<'
+            for token in self.tokens[n, :self.num_turns[n]].tolist():
+                token, disc = divmod(token, NUM_CARDS)
+                token, action = divmod(token, NUM_ACTIONS)
+                src, drawn = divmod(token, NUM_CARDS)
+                history += ('+' if src else '-') + to_char(drawn) + str(action if action != Actions.DISCARD else 6) + to_char(disc)
+            history += '>' + str(self.turn[n])
+            history += "".join(str(int(self.hidden[n, p].sum())) for p in range(self.num_players))
+            history += "".join(to_char(c) for c in self.hands[n].ravel().tolist())
+            history += "".join("%02d" % s for s in scores[n].tolist())
+            histories.append(history)
+        return histories
+
+    def play_games(self, players, record_history=False):
+        """
+        Plays full games of Golf, of nine rounds each, where every game is played as a row of the simulator.
+        Args:
+            players ([Batch_Policy]): The vectorised policies of each player, in order of position.
+            record_history (boolean): Whether the game history string of each game should be created.
+        Returns: A tuple containing a (N, P) array of the total scores of each game and a list of game histories (or None).
+        """
+        totals = np.zeros((self.num_rounds, self.num_players), dtype=np.int64)
+        games = [""]*self.num_rounds if record_history else None
+        for r in range(9):
+            scores, histories = self.play(players, r, record_history=record_history)
+            totals += scores
+            if record_history:
+                games = [g + h + '\n' for g, h in zip(games, histories)]
+        return totals, games
+
+
+class Batch_Policy(ABC):
+    """
+    An abstract class of a vectorised player which makes decisions for many rounds of Batch_Golf at once.
+    """
+
+    @abstractmethod
+    def choose_draw(self, sim, rows, states):
+        """
+        Decides whether to draw from the deck or the discard pile in each of the given rounds.
+        Args:
+            sim (Batch_Golf): The simulator playing the rounds.
+            rows (numpy.ndarray): The indexes of the rounds where it is the players turn.
+            states (numpy.ndarray): A (len(rows), 54) array of the game states of the rounds.
+        Returns: A boolean array which is True where the player draws from the deck.
+        """
+        pass
+
+    @abstractmethod
+    def choose_discard(self, sim, rows, states, drawn):
+        """
+        Decides what card to discard in each of the given rounds.
+        Args:
+            sim (Batch_Golf): The simulator playing the rounds.
+            rows (numpy.ndarray): The indexes of the rounds where it is the players turn.
+            states (numpy.ndarray): A (len(rows), 54) array of the game states of the rounds, before the card was drawn.
+            drawn (numpy.ndarray): The index of the card drawn in each round.
+        Returns: An int array of the discarded card location (0-5 or Actions.DISCARD) of each round.
+        """
+        pass
+
+class Random_Batch_Policy(Batch_Policy):
+    """
+    The vectorised equivalent of the Random_Golf_Player, all decisions are made randomly with equal probability.
+    Attributes:
+        rng (numpy.random.Generator): The random generator used to make decisions.
+    """
+    def __init__(self, rng=None):
+        self.rng = np.random.default_rng(rng)
+
+    def choose_draw(self, sim, rows, states):
+        return self.rng.random(len(rows)) < 0.5
+
+    def choose_discard(self, sim, rows, states, drawn):
+        #Prevents the player discarding a card drawn from the discard pile
+        legal = np.ones((len(rows), 7), dtype=bool)
+        legal[:, 6] = states[np.arange(len(rows)), drawn] != -2
+        return _random_legal(self.rng, legal)
+
+class Greedy_Batch_Policy(Batch_Policy):
+    """
+    The vectorised equivalent of the Greedy_Golf_Player.
+    Attributes:
+        rng (numpy.random.Generator): The random generator used to make decisions.
+    """
+    def __init__(self, rng=None):
+        self.rng = np.random.default_rng(rng)
+
+    def choose_draw(self, sim, rows, states):
+        value = VALUE_TABLE[sim.discard_top(rows)]
+        return (6 < value) & (value < 13)
+
+    def choose_discard(self, sim, rows, states, drawn):
+        local = np.arange(len(rows))
+        seat = sim.turn[rows]
+        hand, hidden = sim.hands[rows, seat], sim.hidden[rows, seat]
+
+        #Exchanges the drawn card with the first visible card that scores more
+        better = ~hidden & (SCORE_TABLE[drawn][:, None] < SCORE_TABLE[hand])
+        has_better = better.any(axis=1)
+
+        #If no card scores more, choose from remaining legal moves randomly
+        legal = np.zeros((len(rows), 7), dtype=bool)
+        legal[:, :6] = hidden
+        legal[:, 6] = states[local, drawn] != -2
+        return np.where(has_better, better.argmax(axis=1), _random_legal(self.rng, legal))
+
+class Value_Batch_Policy(Batch_Policy):
+    """
+    The vectorised equivalent of the Golf_Player, decisions are made by evaluating game states with a function approximator.
+    The decisions made are identical to those of a Golf_Player with the same function approximator.
+    Attributes:
+        function_approximator (Func_Approx): The function approximator used to evaluate game states.
+    """
+    def __init__(self, function_approximator):
+        self.function_approximator = function_approximator
+
+    def values(self, states, rounds=None):
+        """
+        Evaluates each game state with the function approximator.
+        Args:
+            states (numpy.ndarray): A (M, 54) array of game states.
+            rounds (numpy.ndarray): The round (row of the simulator) each state belongs to. Not used.
+        Returns: A (M,) array of the values of the states.
+        """
+        return self.function_approximator.value_of_states(states.tolist())
+
+    def exchange_states(self, sim, rows, states, cards, owner):
+        """
+        The vectorised equivalent of Golf_Player.exchange_states.
+        Creates the states obtained by exchanging each card with every card in the hand.
+        Args:
+            sim (Batch_Golf): The simulator playing the rounds.
+            rows (numpy.ndarray): The indexes of the rounds where it is the players turn.
+            states (numpy.ndarray): A (len(rows), 54) array of the game states of the rounds.
+            cards (numpy.ndarray): The index of each card being exchanged.
+            owner (numpy.ndarray): The position in rows of the round each card belongs to.
+        Returns: A (len(cards)*6, 54) array of the states, the six exchanges of each card being consecutive.
+        """
+        M = len(cards)
+        seat = sim.turn[rows]
+        hands = sim.hands[rows, seat][owner]
+        visible = ~sim.hidden[rows, seat][owner]
+
+        candidates = np.repeat(states[owner][:, None, :], 6, axis=1)
+        slots = np.arange(6)
+        candidates[np.arange(M)[:, None], slots[None, :], cards[:, None]] = slots
+        #If the card is not hidden, then the player would known what card would go to the discard pile
+        m, i = np.nonzero(visible)
+        candidates[m, i, hands[m, i]] = -2
+        return candidates.reshape((M*6, NUM_CARDS))
+
+    def max_val_ind_exchange(self, sim, rows, states, cards, owner):
+        """
+        The vectorised equivalent of Golf_Player.max_val_ind_exchange.
+        Calculates the maximum value of each card by evaluating the states obtained by exchanging it with every card in the hand.
+        Args:
+            sim (Batch_Golf): The simulator playing the rounds.
+            rows (numpy.ndarray): The indexes of the rounds where it is the players turn.
+            states (numpy.ndarray): A (len(rows), 54) array of the game states of the rounds.
+            cards (numpy.ndarray): The index of each card being exchanged.
+            owner (numpy.ndarray): The position in rows of the round each card belongs to.
+        Returns: A tuple of arrays containing the maximum value of each card and the index in the hand that results in that value.
+        """
+        vals = self.values(self.exchange_states(sim, rows, states, cards, owner), np.repeat(rows[owner], 6)).reshape((len(cards), 6))
+        index = vals.argmax(axis=1)
+        return vals[np.arange(len(cards)), index], index
+
+    def choose_draw(self, sim, rows, states):
+        R = len(rows)
+        local = np.arange(R)
+        r, c = np.nonzero(states == -1)
+
+        #Evaluate the exchanges of the discard and every unknown card, along with the current states, in a single batch
+        vals = self.values(np.concatenate([self.exchange_states(sim, rows, states, sim.discard_top(rows), local),
+                                           self.exchange_states(sim, rows, states, c, r), states]),
+                           np.concatenate([np.repeat(rows, 6), np.repeat(rows[r], 6), rows]))
+        val_discard = vals[:R*6].reshape((R, 6)).max(axis=1)
+        val_unknown = vals[R*6:-R].reshape((len(r), 6)).max(axis=1)
+        val_current = vals[-R:]
+
+        #Draw from the deck if the card doesn't improve the hand
+        from_deck = val_current > val_discard
+
+        #Counts the number of unknown cards that have a greater maximum value
+        over = np.bincount(r[val_unknown > val_discard[r]], minlength=R)
+        leq = np.bincount(r, minlength=R) - over
+        return from_deck | (over > leq)
+
+    def choose_discard(self, sim, rows, states, drawn):
+        R = len(rows)
+        local = np.arange(R)
+        #Evaluate every exchange of the drawn cards, along with the current states, in a single batch
+        vals = self.values(np.concatenate([self.exchange_states(sim, rows, states, drawn, local), states]),
+                           np.concatenate([np.repeat(rows, 6), rows]))
+        exchange_vals = vals[:R*6].reshape((R, 6))
+        index = exchange_vals.argmax(axis=1)
+        val, val_current = exchange_vals[local, index], vals[R*6:]
+
+        #Prevent player from discarding card drawn from discard pile, else check if card improves upon current hand
+        from_pile = states[local, drawn] == -2
+        return np.where(from_pile | (val > val_current), index, int(Actions.DISCARD))
+
+def _random_legal(rng, legal):
+    """
+    Chooses uniformly at random from the legal discard actions of each round.
+    Args:
+        rng (numpy.random.Generator): The random generator used to make the choice.
+        legal (numpy.ndarray): A (R, 7) boolean array of legal actions, the columns being the exchanges 0-5 and the discard.
+    Returns: An int array of the chosen actions.
+    """
+    keys = np.where(legal, rng.random(legal.shape), -1.0)
+    choice = keys.argmax(axis=1)
+    return np.where(choice == 6, int(Actions.DISCARD), choice)
+
+def policy_from_player(player, rng=None):
+    """
+    Creates the vectorised policy equivalent to a player.
+    Args:
+        player (Player): A Golf_Player, Random_Golf_Player or Greedy_Golf_Player.
+        rng (numpy.random.Generator): The random generator used by the random and greedy policies.
+    Returns: A Batch_Policy that plays in the same manner as the player.
+    """
+    if isinstance(player, Golf_Player):
+        return Value_Batch_Policy(player.function_approximator)
+    elif isinstance(player, Greedy_Golf_Player):
+        return Greedy_Batch_Policy(rng)
+    elif isinstance(player, Random_Golf_Player):
+        return Random_Batch_Policy(rng)
+    else:
+        raise AttributeError("No vectorised policy exists for player of type %s" % type(player).__name__)
@@ -16,12 +16,11 @@ import os
 import sys
 import queue
 import threading
-import copy
-from operator import add
 import numpy as np
 
-from golf import Golf, Golf_Analyser
+from compact_golf import Compact_Golf, Round_Result
 from player import Golf_Player, Random_Golf_Player
+from game_log import Game_Log_Writer
 import function_approximator as fa
 
 def check_exit(input_queue):
@@ -43,118 +42,155 @@ def check_exit(input_queue):
 BATCH_SIZE = 25
 NUM_PAIRS = 5
 POINTS_THRESHOLD = 15*NUM_PAIRS*2
+#Whether the game histories are recorded and saved to file, the games against the random player are only played if so
+SAVE_GAMES = True
+#The compression of the game files, one of None, "gzip", "lzma" or "zstd"
+GAME_LOG_COMPRESSION = None
 
-#Handles command line arguments
-DIR_PATH = sys.argv[1]
-if sys.argv[2] == "one_hot_hand":
-    STATE_FUNCTION = fa.one_hot_hand
-elif sys.argv[2] == "one_hot_state_and_hand":
-    STATE_FUNCTION = fa.one_hot_state_and_hand
-elif sys.argv[2] ==  "one_hot_state":
-    STATE_FUNCTION = fa.one_hot_state
-else:
-    raise AttributeError("Input representation must be either one_hot_hand, one_hot_state_and_hand, or one_hot_state")
-
-#Creates relevant directories if they do not exist
-if not os.path.exists(DIR_PATH):
-    os.makedirs(DIR_PATH)
-if not os.path.exists(os.path.join(DIR_PATH, "training")):
-    os.makedirs(os.path.join(DIR_PATH, "training"))
-if not os.path.exists(os.path.join(DIR_PATH, "random")):
-    os.makedirs(os.path.join(DIR_PATH, "random"))
-
-#Search given directory for player and opponent back-up files. Load if exist, create new if they do not 
-try:
-    with open(os.path.join(DIR_PATH, 'PLAYER_PICKLE.p'), 'rb') as f:
-        player = pickle.load(f)
-except FileNotFoundError:
-    player = Golf_Player(STATE_FUNCTION)
-try:
-    with open(os.path.join(DIR_PATH, 'OPPONENT_PICKLE.p'), 'rb') as f:
-        opponent = pickle.load(f)
-except FileNotFoundError:
-    opponent = Golf_Player(STATE_FUNCTION)
-    opponent.add_noise()    #DELETE?????
-
-#Create a golf and random_player instance
-g = Golf()
-random_player = Random_Golf_Player()
-
-#initialise parameters to monitor user input
-run = True
-input_queue = queue.Queue()
-#Daemon means thread will stop running once main program terminates
-input_thread = threading.Thread(target=check_exit, args=(input_queue,), daemon=True)
-input_thread.start()
-
-##TRAINING##
-while run:
-    GAMES = ["",""]
-    RANDOM_GAMES = ["",""]
-    for _ in range(BATCH_SIZE):
-        
-        #Play games against the random player
-        for _ in range(NUM_PAIRS):
-            game_1, game_2 = g.play_pair(player, random_player)
-            #Appends the result strings to each element in RANDOM_GAMES
-            RANDOM_GAMES = list(map(add, RANDOM_GAMES, [game_1, game_2]))
-            RANDOM_GAMES[0]+='\n'
-            RANDOM_GAMES[1]+='\n'
-        
-        scores = []
-        for _ in range(NUM_PAIRS):
-            game_1, game_2 = g.play_pair(player, opponent)
-            scores_1 = Golf_Analyser.extract_scores(game_1)
-            scores_2 = Golf_Analyser.extract_scores(game_2)
+def play_epoch(g, player, opponent, random_player=None, seeds=None, log=None, random_log=None):
+    """
+    Plays an epoch of NUM_PAIRS pairs of games between the player and the opponent, and the games against the random player if they are logged.
+    Args:
+        g (Compact_Golf): The engine the games are played with.
+        player, opponent (Golf_Player): The two players being trained.
+        random_player (Random_Golf_Player): The player that the player plays the games that make no impact on the training. None if these games are not played.
+        seeds (numpy.ndarray): The seed of each pair of games against the opponent. If None, the global random states are used.
+        log, random_log (Game_Log_Writer): The writers the games against the opponent and random player are appended to,
+            with a stream for each position. None if the games are not recorded.
+    Returns: The total scores of the player and opponent (numpy.ndarray)
+    """
+    #Play games against the random player
+    for _ in range(NUM_PAIRS if random_log is not None and random_player is not None else 0):
+        random_log.write(g.play_pair(player, random_player))
+    
+    scores = []
+    for i in range(NUM_PAIRS):
+        results_1, results_2 = g.play_pair_results(player, opponent, record_history=log is not None, seed=None if seeds is None else seeds[i])
+        scores_1 = Round_Result.total_scores(results_1)
+        scores_2 = Round_Result.total_scores(results_2)
+    
+        #Append the scores from the pair of games to the scores variable
+        scores.append(scores_1)
+        scores.append(scores_2[::-1]) #Reverse scores due to reversed positions
         
-            #print(scores_1)
-            #print(scores_2[::-1])
+        #Appends the game of each position to its file
+        if log is not None:
+            log.write(["".join(result.history + '\n' for result in results) for results in (results_1, results_2)])
+
+    return np.sum(scores, axis=0)
+
+def coevolve(player, opponent, total_scores, rng=None):
+    """
+    Updates the relevant player according to the differences in their scores over an epoch, in place.
+    The player that lost by a large margin is replaced by a noisy copy of the winner, a smaller margin moves it towards the winner.
+    If the scores are close, noise is added to the opponent.
+    Args:
+        player, opponent (Golf_Player): The two players being trained.
+        total_scores (numpy.ndarray): The total scores of the player and opponent over the epoch.
+        rng (numpy.random.Generator): The random generator of the noise. If None, the default generator is used.
+    Returns: None
+    """
+    if total_scores[0] < total_scores[1] - 2*POINTS_THRESHOLD:
+        opponent.copy_from(player)
+        opponent.add_noise(rng=rng)
+    elif total_scores[0] < total_scores[1] - POINTS_THRESHOLD:
+        opponent.update_network(player)
+    elif total_scores[0] > total_scores[1] + 2*POINTS_THRESHOLD:
+        player.copy_from(opponent)
+        player.add_noise(rng=rng)
+    elif total_scores[0] > total_scores[1] + POINTS_THRESHOLD:
+        player.update_network(opponent)
+    else:
+        opponent.add_noise(rng=rng)
+
+if __name__ == '__main__':
+    #Handles command line arguments
+    DIR_PATH = sys.argv[1]
+    if sys.argv[2] == "one_hot_hand":
+        STATE_FUNCTION = fa.one_hot_hand
+    elif sys.argv[2] == "one_hot_state_and_hand":
+        STATE_FUNCTION = fa.one_hot_state_and_hand
+    elif sys.argv[2] ==  "one_hot_state":
+        STATE_FUNCTION = fa.one_hot_state
+    else:
+        raise AttributeError("Input representation must be either one_hot_hand, one_hot_state_and_hand, or one_hot_state")
+
+    #Creates relevant directories if they do not exist
+    if not os.path.exists(DIR_PATH):
+        os.makedirs(DIR_PATH)
+    if not os.path.exists(os.path.join(DIR_PATH, "training")):
+        os.makedirs(os.path.join(DIR_PATH, "training"))
+    if not os.path.exists(os.path.join(DIR_PATH, "random")):
+        os.makedirs(os.path.join(DIR_PATH, "random"))
+
+    #Search given directory for player and opponent back-up files. Load if exist, create new if they do not 
+    try:
+        with open(os.path.join(DIR_PATH, 'PLAYER_PICKLE.p'), 'rb') as f:
+            player = pickle.load(f)
+    except FileNotFoundError:
+        player = Golf_Player(STATE_FUNCTION)
+    try:
+        with open(os.path.join(DIR_PATH, 'OPPONENT_PICKLE.p'), 'rb') as f:
+            opponent = pickle.load(f)
+    except FileNotFoundError:
+        opponent = Golf_Player(STATE_FUNCTION)
+        opponent.add_noise()    #DELETE?????
+
+    #Create a golf and random_player instance
+    g = Compact_Golf()
+    random_player = Random_Golf_Player()
+    #The generator of the noise added to the players, which is drawn in place. Seeded from the global random state so that numpy.random.seed still controls it
+    noise_rng = np.random.default_rng(np.random.randint(2**31))
+
+    #initialise parameters to monitor user input
+    run = True
+    input_queue = queue.Queue()
+    #Daemon means thread will stop running once main program terminates
+    input_thread = threading.Thread(target=check_exit, args=(input_queue,), daemon=True)
+    input_thread.start()
+
+    #Games are appended to file as they are played, separate files are written for each permuitation of player positions to aid with analysis.
+    #A new pair of files is started for every batch
+    if SAVE_GAMES:
+        log = Game_Log_Writer(os.path.join(DIR_PATH, "training"), games_per_shard=BATCH_SIZE*NUM_PAIRS, background=True,
+                              compression=GAME_LOG_COMPRESSION)
+        random_log = Game_Log_Writer(os.path.join(DIR_PATH, "random"), games_per_shard=BATCH_SIZE*NUM_PAIRS, background=True,
+                                     compression=GAME_LOG_COMPRESSION)
+    else:
+        log, random_log = None, None
+
+    ##TRAINING##
+    try:
+        while run:
+            for _ in range(BATCH_SIZE):
+                total_scores = play_epoch(g, player, opponent, random_player, log=log, random_log=random_log)
+
+                #print() #ADD BETTER DISPLAY
             
-            #Append the scores from the pair of games to the scores variable
-            scores.append(scores_1)
-            scores.append(scores_2[::-1]) #Reverse scores due to reversed positions
+                print("End of Epoch")
+                print("Player mean score  : %.2f" % (total_scores[0]/(NUM_PAIRS*2)))
+                print("Opponent mean score: %.2f\n" % (total_scores[1]/(NUM_PAIRS*2)))
             
-            #Appends the result strings to each element in RANDOM_GAMES
-            GAMES = list(map(add, GAMES, [game_1, game_2]))
-            GAMES[0]+='\n'
-            GAMES[1]+='\n'
+                #Update the relevant player according to the differences in their scores
+                coevolve(player, opponent, total_scores, noise_rng)
 
-        #print() #ADD BETTER DISPLAY
-        
-        total_scores = np.sum(scores, axis=0)
-        print("End of Epoch")
-        print("Player mean score  : %.2f" % total_scores[0]/(NUM_PAIRS*2))
-        print("Opponent mean score: %.2f\n" % total_scores[1]/(NUM_PAIRS*2))
-        
-        #Update the relevant player according to the differences in their scores
-        if total_scores[0] < total_scores[1] - 2*POINTS_THRESHOLD:
-            opponent = copy.deepcopy(player)
-            opponent.add_noise()
-        elif total_scores[0] < total_scores[1] - POINTS_THRESHOLD:
-            opponent.update_network(player)
-        elif total_scores[0] > total_scores[1] + 2*POINTS_THRESHOLD:
-            player = copy.deepcopy(opponent)
-            player.add_noise()
-        elif total_scores[0] > total_scores[1] + POINTS_THRESHOLD:
-            player.update_network(opponent)
-        else:
-            opponent.add_noise()
-
-
-    print("Writing to file")
-    filename = time.strftime("%Y%m%d-%H%M%S-", time.gmtime())
-    #Write games to file. Separate files are written for each permuitation of player positions to aid with analysis  
-    for i in range(2):
-        with open(os.path.join(DIR_PATH, "training", '%s%d.txt' % (filename, i)), 'w+') as f:
-            f.write(GAMES[i])
-        with open(os.path.join(DIR_PATH, "random", '%s%d.txt' % (filename, i)), 'w+') as f:
-            f.write(RANDOM_GAMES[i])
-
-    #Serialise players to file
-    with open(os.path.join(DIR_PATH, 'PLAYER_PICKLE.p'), 'wb+') as f:
-        pickle.dump(player, f)
-    with open(os.path.join(DIR_PATH, 'OPPONENT_PICKLE.p'), 'wb+') as f:
-        pickle.dump(opponent, f)
-
-    #Detect if user has entered "exit"
-    run = input_queue.empty()
\ No newline at end of file
+            #Detect if user has entered "exit"
+            run = input_queue.empty()
+            #Write the games of the batch, so that the game files are never behind the serialised players
+            if SAVE_GAMES:
+                print("Writing to file")
+                log.flush()
+                random_log.flush()
+
+            #Serialise players to file
+            with open(os.path.join(DIR_PATH, 'PLAYER_PICKLE.p'), 'wb+') as f:
+                pickle.dump(player, f)
+            with open(os.path.join(DIR_PATH, 'OPPONENT_PICKLE.p'), 'wb+') as f:
+                pickle.dump(opponent, f)
+    finally:
+        #Waits for the background threads to finish writing the buffered games
+        if SAVE_GAMES:
+            try:
+                log.close()
+            finally:
+                random_log.close()
@@ -0,0 +1,460 @@
+"""
+---compact_golf.py---
+Contains the Compact_Golf class, an alternative engine for playing the card game Golf.
+Rather than building Deck.Card objects, every card is represented by a small integer (0-53) equal to its index in the game state.
+Hands are int8 numpy arrays with a separate bitmask of hidden cards, and all scoring, indexing and
+character encoding is performed through the lookup tables defined in this module.
+For the same seed, the game histories produced are identical to those produced by Golf.
+"""
+import random
+import numpy as np
+
+from deck import Deck
+from actions import Actions
+from golf import Golf
+
+NUM_CARDS = 54
+
+#The value and suit of each card index, the inverse of Golf.get_card_index
+CARD_VALUES = tuple([i%13 + 1 for i in range(52)] + [-1, -1])
+CARD_SUITS = tuple([i//13 + 1 for i in range(52)] + [-2, -1])
+#The score of each card index when scored on its own
+CARD_SCORES = tuple(Golf.card_score(v) for v in CARD_VALUES)
+#The character of each card index used in the game history, hidden cards are represented by '#'
+CARD_CHARS = "".join(chr(65 + i) for i in range(NUM_CARDS))
+HIDDEN_CHAR = '#'
+#The score of a column of the hand containing the two card indexes
+COLUMN_SCORES = np.array([[0 if CARD_VALUES[i] == CARD_VALUES[j] else CARD_SCORES[i] + CARD_SCORES[j]
+                            for j in range(NUM_CARDS)] for i in range(NUM_CARDS)], dtype=np.int16)
+
+#The order in which Deck.init_deck creates its cards, allowing for decks to be shuffled identically
+DECK_ORDER = tuple([(s-1)*13 + v-1 for v in range(1, 14) for s in range(1, 5)] + [53, 52])
+
+#Read only Card objects given to the players in place of the cards in their hands.
+#Players only ever inspect cards so the same objects can be shared between all games.
+CARD_VIEWS = tuple(Deck.Card(CARD_VALUES[i], CARD_SUITS[i], hidden=False) for i in range(NUM_CARDS))
+HIDDEN_CARD = Deck.Card(0, 0, hidden=True)
+
+#The bitmask of a hand where all six cards are hidden
+ALL_HIDDEN = 0b111111
+
+def card_from_index(index):
+    """
+    Converts a card index into the Card object given to players.
+    Args:
+        index (int): The index of the card (0-53).
+    Returns: The shared, face up Card object of the card.
+    """
+    return CARD_VIEWS[index]
+
+def index_from_card(card):
+    """
+    Converts a Card object into its card index regardless of whether it is hidden.
+    Args:
+        card (Deck.Card): The card to be converted.
+    Returns: The index of the card (0-53).
+    """
+    return 54 + card.suit if card.value == -1 else (card.suit-1)*13 + card.value-1
+
+def _read_only(deck):
+    """
+    Prevents a deck permutation from being altered so that it can be safely shared between games.
+    Args:
+        deck (numpy.ndarray): The deck permutation.
+    Returns: The same array, marked as not writeable.
+    """
+    deck.flags.writeable = False
+    return deck
+
+def new_deck():
+    """
+    Creates a shuffled deck of card indexes.
+    The deck is shuffled using the random.shuffle method in the same manner as Deck,
+        such that the order of the cards is identical to a Deck created with the same random state.
+    Returns: A read only uint8 array of 54 card indexes where the last element is the 'top' of the deck.
+    """
+    deck = list(DECK_ORDER)
+    random.shuffle(deck)
+    return _read_only(np.array(deck, dtype=np.uint8))
+
+def deck_permutation(seed):
+    """
+    Creates the shuffled deck of card indexes determined by a seed, the same seed always produces the same deck.
+    Args:
+        seed (int): The seed of the deck.
+    Returns: A read only uint8 array of 54 card indexes where the last element is the 'top' of the deck.
+    """
+    return _read_only(np.random.default_rng(seed).permutation(NUM_CARDS).astype(np.uint8))
+
+def round_rngs(seed, num_players=2):
+    """
+    Creates the random generators of a round determined by the seed of the round.
+    The generators are independent counter-based streams spawned from the seed, one for the engine and one for each player,
+        and are independent of the stream used by deck_permutation for the same seed.
+    Calling the function again with the same seed recreates identical generators, allowing rounds to be replayed exactly.
+    Args:
+        seed (int): The seed of the round.
+        num_players (int): The number of players in the round.
+    Returns: A tuple containing the generator of the engine and a list containing the generator of each player.
+    """
+    streams = [np.random.default_rng(np.random.SeedSequence(int(seed), spawn_key=(i,))) for i in range(num_players + 1)]
+    return streams[0], streams[1:]
+
+def deck_permutations(seeds):
+    """
+    Creates the deck determined by each seed in an array of seeds.
+    The decks are generated once and can be shared, read only, between all games that use the seeds.
+    Args:
+        seeds (numpy.ndarray): An array of seeds of any shape.
+    Returns: A read only uint8 array of shape seeds.shape + (54,) containing the deck of each seed.
+    """
+    seeds = np.asarray(seeds)
+    decks = np.array([deck_permutation(int(seed)) for seed in seeds.ravel()], dtype=np.uint8)
+    return _read_only(decks.reshape(seeds.shape + (NUM_CARDS,)))
+
+def score_hand(hand):
+    """
+    Calculates the total score of a given hand of card indexes via the column score lookup table.
+    Args:
+        hand (numpy.ndarray): The hand of the player, an int8 array of size (6,).
+    Returns: An integer value representing the score of the hand.
+    """
+    return int(COLUMN_SCORES[hand[:3], hand[3:]].sum())
+
+def hand_to_chars(hand, hidden):
+    """
+    Converts a hand of card indexes into the characters used in the game history.
+    Args:
+        hand (numpy.ndarray): The hand of the player, an int8 array of size (6,).
+        hidden (int): The bitmask of the hidden cards in the hand.
+    Returns: A string of six characters representing the hand.
+    """
+    return "".join(HIDDEN_CHAR if hidden >> i & 1 else CARD_CHARS[c] for i, c in enumerate(hand.tolist()))
+
+
+class Round_Result():
+    """
+    A lightweight record of the outcome of a single round of Golf, allowing the outcome to be used without parsing the game history.
+    Attributes:
+        scores ([int]): The score of each player, in order of position.
+        num_turns (int): The number of turns taken in the round.
+        ended_by (int): The position of the player that ended the round, or None if the round was terminated due to a loop.
+        hands ([String]): The final hand of each player, using the same characters as the game history.
+        terminated (boolean): True if the round was terminated due to a loop.
+        history (String): The game history of the round, or None if it was not recorded.
+    """
+    __slots__ = ("scores", "num_turns", "ended_by", "hands", "terminated", "history")
+
+    def __init__(self, scores, num_turns, ended_by, hands, terminated, history=None):
+        self.scores = scores
+        self.num_turns = num_turns
+        self.ended_by = ended_by
+        self.hands = hands
+        self.terminated = terminated
+        self.history = history
+
+    @staticmethod
+    def total_scores(results):
+        """
+        Sums the scores of each player over a game of rounds, the equivalent of Golf_Analyser.extract_scores.
+        Args:
+            results ([Round_Result]): The results of each round of the game.
+        Returns: A list of the final (int) scores of each player.
+        """
+        return [sum(scores) for scores in zip(*(result.scores for result in results))]
+
+
+class Compact_Golf():
+    """
+    Contains all methods and attributes to represent the card game Golf using integer coded cards.
+    It can be used in place of the Golf class, the players are given Card objects in the same manner and the same game history is produced.
+    Attributes:
+        discard_pile ([int]): A list which contains the indexes of the cards in the discard pile.
+        stock ([int]): The indexes of the cards remaining in the deck, where the last element is the 'top' of the deck.
+            This is a private copy of the deck the round was initialised with.
+        hands ([numpy.ndarray]): The hand of each player in the current round as an int8 array of size (6,).
+        hidden ([int]): The bitmask of hidden cards in the hand of each player, bit i is set if the ith card is hidden.
+        states ([[int]]): The game state from the perspective of each player, updated as cards move rather than rebuilt each turn.
+        debug (boolean): If True, the maintained game states are checked against get_state at the start of every turn.
+    """
+
+    def __init__(self, stock=None, debug=False):
+        self.hands = []
+        self.hidden = []
+        self.states = []
+        self.debug = debug
+        self.initialise(stock)
+
+    def initialise(self, stock=None):
+        """
+        Initialises/Resets the deck and discard pile.
+        If a deck has been specified (via the stock argument) then the stock is a copy of its card indexes, else a new deck is created.
+        Decks given as permutation arrays are never altered, so the same deck can be reused for any number of rounds.
+        Args:
+            stock (numpy.ndarray/[int]/Deck): The deck to initialise the game with,
+                either a permutation of card indexes (such as from deck_permutation) or a Deck. Set to None by default.
+        Returns: None
+        """
+        self.discard_pile = []
+        if stock is None:
+            stock = new_deck()
+        if isinstance(stock, Deck):
+            self.stock = [index_from_card(card) for card in stock.deck]
+        elif isinstance(stock, np.ndarray):
+            self.stock = stock.tolist()
+        else:
+            self.stock = list(stock)
+
+    def get_state(self, turn):
+        """
+        Converts the current game state into a list of (54) integers from the perspective of one player.
+        The state is identical to that produced by Golf.get_state.
+        The state is rebuilt from scratch, during play_round the maintained states attribute is used instead.
+        Args:
+            turn (int): The position of the player whose perspective the state is being generated from.
+        Returns: A list of 54 integers representing the game state.
+        """
+        state = [-1]*54
+        for card in self.discard_pile:
+            state[card] = -2
+
+        for p, (hand, hidden) in enumerate(zip(self.hands, self.hidden)):
+            if p == turn:
+                continue
+            for i, card in enumerate(hand.tolist()):
+                if not hidden >> i & 1:
+                    state[card] = -3
+
+        hand, hidden = self.hands[turn], self.hidden[turn]
+        for i, card in enumerate(hand.tolist()):
+            if not hidden >> i & 1:
+                state[card] = i
+
+        return state
+
+    def _show(self, turn, card, slot):
+        """
+        Updates the game states once a card is face up in the hand of a player.
+        Args:
+            turn (int): The position of the player whose hand the card is in.
+            card (int): The index of the card.
+            slot (int): The position of the card in the hand.
+        Returns: None
+        """
+        for p, state in enumerate(self.states):
+            state[card] = slot if p == turn else -3
+
+    def _discard(self, card):
+        """
+        Adds a card to the discard pile and updates the game states of all players.
+        Args:
+            card (int): The index of the card.
+        Returns: None
+        """
+        self.discard_pile.append(card)
+        for state in self.states:
+            state[card] = -2
+
+    def play_round(self, round_num, *players, rng=None, player_rngs=None):
+        """
+        Plays a single round of the card game Golf, in the same manner as Golf.play_round.
+        Args:
+            round_num (int): The current round number. Determines which player goes first.
+            players ([Player]): The players in the game.
+            rng, player_rngs: The random generators of the round, see play_round_result.
+        Returns: A string containing the game history
+        """
+        return self.play_round_result(round_num, *players, record_history=True, rng=rng, player_rngs=player_rngs).history
+
+    def play_round_result(self, round_num, *players, record_history=False, rng=None, player_rngs=None):
+        """
+        Plays a single round of the card game Golf, returning the outcome as a Round_Result.
+        The hand attribute of each player is kept as a list of Card objects so that the players can inspect their hand.
+        Loops are detected by counting each turn as an integer token, so the game history only needs to be built when it is required.
+        If random generators are given, the round does not use or alter any global random state and so is reproducible
+            regardless of what else is being played, such as in other threads. Each thread requires its own engine and players.
+        Args:
+            round_num (int): The current round number. Determines which player goes first.
+            players ([Player]): The players in the game.
+            record_history (boolean): Whether the game history string is created. False by default.
+            rng (numpy.random.Generator): The generator used to turn cards face up and shuffle the recycled stock.
+                If None, the numpy.random and random modules are used in the same manner as Golf.play_round.
+            player_rngs ([numpy.random.Generator]): The generator given to each player for their decisions.
+                If None, no generator is passed and the players use the python random module.
+        Returns: A Round_Result containing the outcome of the round.
+        """
+        PLAYERS = list(players)
+        num_players = len(PLAYERS)
+        turn = round_num % num_players
+
+        GAME_HISTORY = str(num_players) + str(turn)
+
+        #Deal the hands of the players from the stock
+        stock = self.stock
+        self.hands = [np.empty((6,), dtype=np.int8) for _ in PLAYERS]
+        self.hidden = [ALL_HIDDEN]*num_players
+        for i in range(6):
+            for hand in self.hands:
+                hand[i] = stock.pop()
+
+        #Turn two cards face up in each players hand
+        self.states = [[-1]*54 for _ in PLAYERS]
+        for p in range(num_players):
+            face_up = np.random.choice(6, 2, False) if rng is None else rng.choice(6, 2, replace=False)
+            self.hidden[p] &= ~(1 << int(face_up[0]) | 1 << int(face_up[1]))
+            for i in face_up.tolist():
+                self._show(p, int(self.hands[p][i]), i)
+
+        for p in range(num_players):
+            if record_history:
+                GAME_HISTORY += hand_to_chars(self.hands[p], self.hidden[p])
+            PLAYERS[p].hand = [HIDDEN_CARD if self.hidden[p] >> i & 1 else CARD_VIEWS[c]
+                                for i, c in enumerate(self.hands[p].tolist())]
+
+        self._discard(stock.pop())
+
+        GAME_HISTORY += '<'
+        turn_counts = {}
+        num_turns = 0
+        terminated = False
+
+        #Turns of the round
+        while self.hidden[turn]:
+            player = PLAYERS[turn]
+            #A copy is given to the player to prevent the maintained state being altered
+            s = self.states[turn][:]
+            if self.debug and s != self.get_state(turn):
+                raise RuntimeError("The maintained game state differs from get_state:\n%s\n%s" % (s, self.get_state(turn)))
+
+            #The player decides where to draw from
+            top_discard = CARD_VIEWS[self.discard_pile[-1]]
+            if player_rngs is None:
+                draw_action = player.choose_draw(top_discard, s)
+            else:
+                draw_action = player.choose_draw(top_discard, s, rng=player_rngs[turn])
+
+            from_deck = draw_action == Actions.DRAW_DECK
+            drawn_card = self.stock.pop() if from_deck else self.discard_pile.pop()
+
+            #The player decides what card to discard
+            if player_rngs is None:
+                discard_action = player.choose_discard(CARD_VIEWS[drawn_card], s)
+            else:
+                discard_action = player.choose_discard(CARD_VIEWS[drawn_card], s, rng=player_rngs[turn])
+
+            if discard_action == Actions.DISCARD:
+                index, disc_card = 6, drawn_card
+                self._discard(drawn_card)
+            else:
+                #Exchange the drawn card with the card to discard, the drawn card is always face up
+                index = discard_action.value
+                hand = self.hands[turn]
+                disc_card = int(hand[index])
+                hand[index] = drawn_card
+                self.hidden[turn] &= ~(1 << index)
+                player.hand[index] = CARD_VIEWS[drawn_card]
+                self._show(turn, drawn_card, index)
+                self._discard(disc_card)
+
+            if record_history:
+                GAME_HISTORY += ('+' if from_deck else '-') + CARD_CHARS[drawn_card] + str(index) + CARD_CHARS[disc_card]
+
+            turn = turn + 1 if turn + 1 < num_players else 0
+            num_turns += 1
+
+            #Check for cycles in the game by counting the occurences of each turn.
+            #Each token uniquely represents the four characters the turn adds to the game history
+            token = ((from_deck*NUM_CARDS + drawn_card)*7 + index)*NUM_CARDS + disc_card
+            turn_counts[token] = turn_counts.get(token, 0) + 1
+            if turn_counts[token] > 5:
+                terminated = True
+                break
+
+            #Recycle stock if empty
+            if not self.stock:
+                self.stock = self.discard_pile[:-1]
+                if rng is None:
+                    random.shuffle(self.stock)
+                else:
+                    rng.shuffle(self.stock)
+                self.discard_pile = self.discard_pile[-1:]
+                #The recycled cards are no longer known to any player
+                for state in self.states:
+                    for card in self.stock:
+                        state[card] = -1
+
+        GAME_HISTORY += '>' + str(turn)
+
+        #Add end game information to the game history, revealing the hand of each player
+        num_hidden, end_hands, scores = "", [], []
+        for p in range(num_players):
+            hand = self.hands[p]
+            num_hidden += str(bin(self.hidden[p]).count('1'))
+            self.hidden[p] = 0
+            PLAYERS[p].hand = [CARD_VIEWS[c] for c in hand.tolist()]
+            end_hands.append(hand_to_chars(hand, 0))
+            scores.append(score_hand(hand))
+
+        if record_history:
+            GAME_HISTORY += num_hidden + "".join(end_hands) + "".join("%02d" % score for score in scores)
+        else:
+            GAME_HISTORY = None
+
+        return Round_Result(scores, num_turns, None if terminated else turn, end_hands, terminated, GAME_HISTORY)
+
+    def play_pair(self, player1, player2, seed=None):
+        """
+        Plays a pair games of Golf where the second game is exactly the same as the first but with the player positions reversed.
+        The games are played in the same manner as Golf.play_pair.
+        Args:
+            player1, player2 (Player): The two players in the game.
+            seed (int): The seed of the pair of games, see play_pair_results. None by default.
+        Returns: The game histories of both games in a list
+        """
+        return ["".join(result.history + '\n' for result in game)
+                for game in self.play_pair_results(player1, player2, record_history=True, seed=seed)]
+
+    def play_pair_results(self, player1, player2, record_history=False, seed=None):
+        """
+        Plays a pair games of Golf where the second game is exactly the same as the first but with the player positions reversed.
+        The games are played in the same manner as Golf.play_pair, returning the outcome of every round as a Round_Result.
+        If a seed is given, each round is played with the deck and generators determined by a round seed drawn from it.
+        The generators of the second game are recreated from the same round seeds, and each player keeps its own generator,
+            so both games are identical even for players that make random decisions.
+        Args:
+            player1, player2 (Player): The two players in the game.
+            record_history (boolean): Whether the game history strings are created. False by default.
+            seed (int): The seed of the pair of games. If None, the global random states are used in the same manner as Golf.play_pair.
+        Returns: A list containing the nine Round_Results of each game, the players being in reversed positions in the second game.
+        """
+        PLAYERS = [player1, player2]
+        num_players = 2
+        games = [[], []]
+        if seed is None:
+            np.random.seed(None)
+            #Generates the random seeds
+            seeds = np.random.randint(0, 2147483648, size=9)
+        else:
+            seeds = np.random.SeedSequence(int(seed)).generate_state(9)
+
+        for r in range(9):
+            round_seed = seeds[r]
+            set_deck = new_deck() if seed is None else deck_permutation(round_seed)
+            for g in range(num_players):
+                #Initialise the round
+                self.initialise(set_deck)
+                if seed is None:
+                    np.random.seed(round_seed)
+                    rng, player_rngs = None, None
+                else:
+                    rng, player_rngs = round_rngs(round_seed, num_players)
+                    #The generators follow the players rather than the positions
+                    player_rngs = player_rngs[g:] + player_rngs[:g]
+                #Play the round
+                games[g].append(self.play_round_result(r, *PLAYERS, record_history=record_history,
+                                                        rng=rng, player_rngs=player_rngs))
+
+                #Reverse player positions
+                PLAYERS += [PLAYERS.pop(0)]
+
+        return games
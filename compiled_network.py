@@ -0,0 +1,164 @@
+"""
+---compiled_network.py---
+Contains the compiled network class, a faster equivalent of the NEAT FeedForwardNetwork.
+A genome is compiled into topological layers of nodes, each layer being evaluated for a whole batch of inputs with a single matrix multiplication.
+Nodes that cannot reach the output are pruned by neat when the network is created, so are never evaluated.
+"""
+import numpy as np
+import neat
+
+def sigmoid_activation(z):
+    """
+    The numpy equivalent of the NEAT sigmoid activation function.
+    Args:
+        z (numpy.ndarray): The inputs of the activation function.
+    Returns: An ndarray containing all activation outputs.
+    """
+    return 1.0/(1.0 + np.exp(-np.clip(5.0*z, -60.0, 60.0)))
+
+def tanh_activation(z):
+    """
+    The numpy equivalent of the NEAT tanh activation function.
+    Args:
+        z (numpy.ndarray): The inputs of the activation function.
+    Returns: An ndarray containing all activation outputs.
+    """
+    return np.tanh(np.clip(2.5*z, -60.0, 60.0))
+
+def relu_activation(z):
+    """
+    The numpy equivalent of the NEAT relu activation function.
+    Args:
+        z (numpy.ndarray): The inputs of the activation function.
+    Returns: An ndarray containing all activation outputs.
+    """
+    return np.where(z > 0.0, z, 0.0)
+
+def identity_activation(z):
+    """
+    The numpy equivalent of the NEAT identity activation function.
+    Args:
+        z (numpy.ndarray): The inputs of the activation function.
+    Returns: The inputs, unchanged.
+    """
+    return z
+
+#Numpy equivalents of the NEAT activation functions, used to evaluate batches of inputs
+NUMPY_ACTIVATIONS = {
+    neat.activations.sigmoid_activation: sigmoid_activation,
+    neat.activations.tanh_activation: tanh_activation,
+    neat.activations.relu_activation: relu_activation,
+    neat.activations.identity_activation: identity_activation,
+}
+
+class Compiled_Network():
+    """
+    Contains all methods and attributes to evaluate a NEAT network with numpy matrices.
+    Each layer contains nodes whose inputs are all network inputs or nodes in earlier layers.
+    The values of the network are stored in the columns of a matrix, the used inputs first and then the nodes of each layer in turn.
+    Inputs that no node is linked from are not used and so are dropped before the network is evaluated.
+    Attributes:
+        input_nodes, output_nodes ([int]): The keys of the input and output nodes of the network.
+        used_inputs (numpy.ndarray): The positions of the inputs that are linked to at least one node.
+        layers ([(numpy.ndarray, numpy.ndarray, numpy.ndarray, [(function, numpy.ndarray)])]): The weights, biases and responses of each layer,
+            along with the numpy activation function of each group of nodes in the layer and their positions in the layer.
+            The weights of a layer are a matrix from the values of all earlier columns to the nodes of the layer.
+        output_columns ([int]): The column of each output node, None if the output node is never evaluated.
+    """
+    def __init__(self, input_nodes, output_nodes, node_evals):
+        self.input_nodes = input_nodes
+        self.output_nodes = output_nodes
+
+        #Place each node in the layer after the deepest node it is linked from
+        depth = {node: 0 for node in input_nodes}
+        for node, _, _, _, _, links in node_evals:
+            depth[node] = 1 + max([depth[i] for i, _ in links], default=0)
+
+        linked = set(i for *_, links in node_evals for i, _ in links)
+        self.used_inputs = np.array([k for k, node in enumerate(input_nodes) if node in linked], dtype=np.intp)
+        columns = {input_nodes[k]: c for c, k in enumerate(self.used_inputs)}
+        self.layers = []
+        for d in range(1, max(depth.values(), default=0) + 1):
+            layer = [evals for evals in node_evals if depth[evals[0]] == d]
+            weights = np.zeros((len(columns), len(layer)))
+            activations = {}
+            for j, (node, act_func, agg_func, bias, response, links) in enumerate(layer):
+                if agg_func is not neat.aggregations.sum_aggregation:
+                    raise ValueError("Only the sum aggregation can be compiled")
+                if act_func not in NUMPY_ACTIVATIONS:
+                    raise ValueError("The activation function of node %d cannot be compiled" % node)
+                for i, w in links:
+                    weights[columns[i], j] += w
+                activations.setdefault(act_func, []).append(j)
+            biases = np.array([evals[3] for evals in layer], dtype=float)
+            responses = np.array([evals[4] for evals in layer], dtype=float)
+            groups = [(NUMPY_ACTIVATIONS[act_func], np.array(positions)) for act_func, positions in activations.items()]
+            self.layers.append((weights, biases, responses, groups))
+            for node, *_ in layer:
+                columns[node] = len(columns)
+
+        self.output_columns = [columns.get(node) for node in output_nodes]
+
+    @staticmethod
+    def create(genome, config):
+        """
+        Compiles a genome into a network, using the nodes and connections neat would use for a FeedForwardNetwork.
+        Args:
+            genome (neat.DefaultGenome): The genome to be compiled.
+            config (neat.Config): The config of the genome.
+        Returns: The compiled network (Compiled_Network)
+        """
+        return Compiled_Network.from_network(neat.nn.FeedForwardNetwork.create(genome, config))
+
+    @staticmethod
+    def from_network(network):
+        """
+        Compiles an existing NEAT FeedForwardNetwork.
+        Args:
+            network (neat.nn.FeedForwardNetwork): The network to be compiled.
+        Returns: The compiled network (Compiled_Network)
+        """
+        return Compiled_Network(network.input_nodes, network.output_nodes, network.node_evals)
+
+    def activate_batch(self, inputs):
+        """
+        Evaluates the network for a batch of inputs.
+        Args:
+            inputs (numpy.ndarray): The inputs of the network, of shape (N, num_inputs).
+        Returns: A (N, num_outputs) array of the outputs of the network.
+        """
+        inputs = np.asarray(inputs, dtype=float)
+        if inputs.shape[1] != len(self.input_nodes):
+            raise RuntimeError("Expected {0:n} inputs, got {1:n}".format(len(self.input_nodes), inputs.shape[1]))
+        return self.activate_used(inputs[:, self.used_inputs])
+
+    def activate_used(self, used_inputs):
+        """
+        Evaluates the network for a batch of inputs which only contain the used inputs.
+        Args:
+            used_inputs (numpy.ndarray): The used inputs of the network, of shape (N, len(used_inputs)).
+        Returns: A (N, num_outputs) array of the outputs of the network.
+        """
+        values = np.asarray(used_inputs, dtype=float)
+        for weights, biases, responses, groups in self.layers:
+            z = biases + responses*np.dot(values, weights)
+            out = np.empty_like(z)
+            for activation, positions in groups:
+                out[:, positions] = activation(z[:, positions])
+            values = np.append(values, out, axis=1)
+
+        #Output nodes that are never evaluated keep a value of zero
+        outputs = np.zeros((len(values), len(self.output_nodes)))
+        for o, c in enumerate(self.output_columns):
+            if c is not None:
+                outputs[:, o] = values[:, c]
+        return outputs
+
+    def activate(self, inputs):
+        """
+        Evaluates the network for a single input, as FeedForwardNetwork.activate does.
+        Args:
+            inputs ([float]): The inputs of the network.
+        Returns: A list of the outputs of the network.
+        """
+        return self.activate_batch(np.reshape(inputs, (1, -1)))[0].tolist()
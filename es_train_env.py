@@ -0,0 +1,78 @@
+"""
+---es_train_env.py---
+An environment for training players using an evolution strategy.
+The player file is loaded from the given directory or created if it does not exist.
+Each generation, a population of perturbed copies of the player play games against the greedy player in lockstep,
+    and the player is moved towards the perturbations that won by the most.
+After every BATCH_SIZE generations the player file is serialised, in the same format as coevo_train_env, so it can be used with play_players.
+
+Args:
+    DIR_PATH (String): First command line argument. The path of the directory where the player file exists or is to be saved.
+    STATE_FUNCTION (String): Second command line argument. The name of the function approximator used by the player.
+        Must be one of either "one_hot_hand", "one_hot_state_and_hand", or "one_hot_state". Only used when no player file exists in DIR_PATH
+"""
+import pickle
+import os
+import sys
+import queue
+import threading
+import numpy as np
+
+from batch_golf import Greedy_Batch_Policy
+from population import ES_Trainer
+from player import Golf_Player
+from coevo_train_env import check_exit
+import function_approximator as fa
+
+BATCH_SIZE = 10
+POPULATION_SIZE = 40
+NUM_GAMES = 4
+SIGMA = 0.1
+LEARNING_RATE = 0.05
+
+if __name__ == '__main__':
+    #Handles command line arguments
+    DIR_PATH = sys.argv[1]
+    STATE_FUNCTIONS = {"one_hot_hand": fa.one_hot_hand, "one_hot_state_and_hand": fa.one_hot_state_and_hand, "one_hot_state": fa.one_hot_state}
+    if sys.argv[2] not in STATE_FUNCTIONS:
+        raise AttributeError("Input representation must be either one_hot_hand, one_hot_state_and_hand, or one_hot_state")
+    STATE_FUNCTION = STATE_FUNCTIONS[sys.argv[2]]
+
+    if not os.path.exists(DIR_PATH):
+        os.makedirs(DIR_PATH)
+
+    #Search given directory for the player back-up file. Load if it exists, create new if it does not
+    try:
+        with open(os.path.join(DIR_PATH, 'PLAYER_PICKLE.p'), 'rb') as f:
+            player = pickle.load(f)
+    except FileNotFoundError:
+        player = Golf_Player(STATE_FUNCTION)
+
+    rng = np.random.default_rng()
+    trainer = ES_Trainer(player.function_approximator.network, player.function_approximator.state_function,
+                         POPULATION_SIZE, SIGMA, LEARNING_RATE, rng)
+    opponent = Greedy_Batch_Policy(rng)
+
+    #initialise parameters to monitor user input
+    run = True
+    input_queue = queue.Queue()
+    #Daemon means thread will stop running once main program terminates
+    input_thread = threading.Thread(target=check_exit, args=(input_queue,), daemon=True)
+    input_thread.start()
+
+    ##TRAINING##
+    generation = 0
+    while run:
+        for _ in range(BATCH_SIZE):
+            fitness = trainer.step(opponent, NUM_GAMES)
+            generation += 1
+            print("Generation %d" % generation)
+            print("Mean margin over greedy player: %.2f" % fitness.mean())
+            print("Best margin over greedy player: %.2f\n" % fitness.max())
+
+        #Serialise the player to file, the player shares the network being trained
+        with open(os.path.join(DIR_PATH, 'PLAYER_PICKLE.p'), 'wb+') as f:
+            pickle.dump(player, f)
+
+        #Detect if user has entered "exit"
+        run = input_queue.empty()
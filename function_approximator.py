@@ -3,41 +3,204 @@
 Contains the function approximator classes as well as functions that can convert game states to the different input representations.
 """
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 import random
 from neural_net import Neural_Network
+from compiled_network import Compiled_Network, NUMPY_ACTIVATIONS
 import numpy as np
 import neat
 
+#The fewest active inputs of each state for which evaluating from a base state is faster than summing every active input
+ACTIVE_DELTA_MIN_WIDTH = 16
+
 class Func_Approx(ABC):
     """
     The function approximator of a player, which allows for game states to be evaluated and assigned a numerical value.
+    The values of states can optionally be memoised in a bounded least recently used cache, keyed by the input the network receives.
+    The cache attributes are class level defaults, so that pickled function approximators without a cache still load.
     Attributes:
         state_function (function): A function which converts the game state into a suitable format for the neural network.
         network (Neural_Network): The neural network that calculates the value of the game state once the input has been converted.
+        cache_capacity (int): The maximum number of values held in the cache, 0 if the cache is disabled.
+        cache_hits, cache_misses (int): The number of values found and not found in the cache since it was enabled.
     """
+    cache_capacity = 0
+    cache_hits = 0
+    cache_misses = 0
+    _cache = None
 
     def __init__(self, state_function, network=None):
         self.state_function = state_function
         self.network = network
 
     @abstractmethod
-    def value_of_state(self, state):
+    def evaluate_state(self, state):
         pass
 
+    def evaluate_states(self, states, base_state=None):
+        """
+        Calculates the value of each of the given game states without the cache.
+        By default each state is evaluated separately, subclasses evaluate the whole batch at once.
+        Args:
+            states ([[int]]): The game states to be evaluated.
+            base_state ([int]): A game state that all the states differ from in only a few positions, if there is one.
+                Allows subclasses to evaluate the states incrementally from the base state. None by default.
+        Returns: A numpy array of floats which denote the value of each game state.
+        """
+        return np.array([self.evaluate_state(state) for state in states], dtype=float)
+
+    def value_of_state(self, state):
+        """
+        Calculates the value of the given game state, using the cache if it is enabled.
+        Args:
+            state ([int]): The game state to be evaluated.
+        Returns: A float which denotes the value of the given game state.
+        """
+        if not self.cache_capacity:
+            return self.evaluate_state(state)
+        return self.value_of_states([state])[0]
+
+    def value_of_states(self, states, base_state=None):
+        """
+        Calculates the value of each of the given game states, using the cache if it is enabled.
+        Only the states whose values are not in the cache are evaluated, in a single batch.
+        Args:
+            states ([[int]]): The game states to be evaluated.
+            base_state ([int]): A game state that all the states differ from in only a few positions, if there is one. None by default.
+        Returns: A numpy array of floats which denote the value of each game state.
+        """
+        if not self.cache_capacity:
+            return self.evaluate_states(states, base_state)
+
+        #Convert the states once, rather than for the keys and again for the missing values
+        if self.state_function in ARRAY_STATE_FUNCTIONS:
+            states = np.asarray(states)
+        keys = self.cache_keys(states)
+        values = np.empty(len(keys))
+        missing = []
+        for i, key in enumerate(keys):
+            value = self._cache.get(key)
+            if value is None:
+                missing.append(i)
+            else:
+                values[i] = value
+                self._cache.move_to_end(key)
+        self.cache_hits += len(keys) - len(missing)
+        self.cache_misses += len(missing)
+
+        if missing:
+            subset = states[missing] if isinstance(states, np.ndarray) else [states[i] for i in missing]
+            for i, value in zip(missing, self.evaluate_states(subset, base_state).tolist()):
+                values[i] = value
+                self._cache[keys[i]] = value
+            #Remove the least recently used values
+            while len(self._cache) > self.cache_capacity:
+                self._cache.popitem(last=False)
+        return values
+
+    def cache_keys(self, states):
+        """
+        Creates a compact key for each of the given game states from the input the network receives,
+            so that states with the same input share the same value in the cache.
+        Args:
+            states ([[int]]): The game states.
+        Returns: A list of the bytes keys of each state.
+        """
+        active = self.active_inputs(states)
+        inputs = self.encode_states(states) if active is None else active.astype(np.int16)
+        return unique_keys(inputs)
+
+    def enable_cache(self, capacity=65536):
+        """
+        Enables the cache of state values, or changes its capacity, emptying it and resetting the counters.
+        Args:
+            capacity (int): The maximum number of values held in the cache, 0 disables the cache.
+        Returns: None
+        """
+        self.cache_capacity = capacity
+        self.cache_hits, self.cache_misses = 0, 0
+        self.clear_cache()
+
+    def clear_cache(self):
+        """
+        Empties the cache of state values, which is required whenever the weights of the network change.
+        Returns: None
+        """
+        self._cache = OrderedDict() if self.cache_capacity else None
+
+    def encode_states(self, states):
+        """
+        Converts each of the given game states with the state_function and stacks them into a single input matrix.
+        If the state_function has an array equivalent, the whole batch is converted at once instead.
+        Args:
+            states ([[int]]): The game states to be converted.
+        Returns: A (len(states), n_input) numpy array with one converted state per row.
+        """
+        array_function = ARRAY_STATE_FUNCTIONS.get(self.state_function)
+        if array_function is None:
+            return np.array([self.state_function(state) for state in states], dtype=float)
+        return array_function(np.asarray(states).reshape((-1, 54))).astype(float)
+
+    def active_inputs(self, states):
+        """
+        Converts each of the given game states to the indexes of the inputs that are one, using the active index equivalent of the state_function.
+        Args:
+            states ([[int]]): The game states to be converted.
+        Returns: A (len(states), k) numpy array of the active inputs of each state, padded with -1.
+            None if the state_function does not have an active index equivalent.
+        """
+        active_function = ACTIVE_STATE_FUNCTIONS.get(self.state_function)
+        if active_function is None:
+            return None
+        return active_function(np.asarray(states).reshape((-1, 54)))
+
 class CoEvo_Func_Approx(Func_Approx):
     """
     The function approximator for players trained with the coevolution algorithm.
     Contains the relevent methods for updating and mutating the weights of the network.
+    The weights are always changed in place, using preallocated buffers of the same shape, so that no arrays are allocated by training.
+    The buffers are not serialised, they are created again the first time they are needed.
     Attributes:
         n_hidden (int): The number of nodes in the hidden layer of the neural network.
         state_function (function): A function which converts the game state into a suitable format for the neural network.
+        rng (numpy.random.Generator): The random generator the initial weights are drawn from. If None, the global numpy random state is used.
     """
-    def __init__(self, n_hidden, state_function):
+    _buffers = None
+
+    def __init__(self, n_hidden, state_function, rng=None):
         #Use the state function to calculate the number of inputs
         n_input = len(state_function([0]*54))
-        network = Neural_Network(n_input, n_hidden, 1)
+        network = Neural_Network(n_input, n_hidden, 1, rng)
         super().__init__(state_function, network)
 
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state.pop('_buffers', None)
+        return state
+
+    def buffers(self):
+        """
+        Returns the scratch arrays of the same shape as the hidden and output weights, creating them if they do not exist.
+        Returns: A tuple of the two buffers (numpy.ndarray, numpy.ndarray)
+        """
+        if self._buffers is None or self._buffers[0].shape != self.network.W_hidden.shape or self._buffers[1].shape != self.network.W_output.shape:
+            self._buffers = (np.empty_like(self.network.W_hidden), np.empty_like(self.network.W_output))
+        return self._buffers
+
+    def copy_from(self, other_func_approx):
+        """
+        Copies the weights of another function approximator into the existing weights of the network, replacing copy.deepcopy.
+        Args:
+            other_func_approx (CoEvo_Func_Approx): The function approximator being copied, with a network of the same shape.
+        Returns: None
+        """
+        if self.network.W_hidden.shape != other_func_approx.network.W_hidden.shape or self.network.W_output.shape != other_func_approx.network.W_output.shape:
+            raise ValueError("Can only copy the weights of a network of the same shape")
+        self.state_function = other_func_approx.state_function
+        np.copyto(self.network.W_hidden, other_func_approx.network.W_hidden)
+        np.copyto(self.network.W_output, other_func_approx.network.W_output)
+        self.clear_cache()
+
     def update(self, opposing_func_approx, crossover=0.05):
         """
         Updates the weights of the neural network in accordance with the coevolution algorithm.
@@ -47,10 +210,14 @@ class CoEvo_Func_Approx(Func_Approx):
             crossover (float): The crossover rate of the update, the percentage in which the weights are moved in the direction of the opposing_func_approx.
         Returns: None
         """
-        self.network.W_hidden = (opposing_func_approx.network.W_hidden - self.network.W_hidden)*crossover + self.network.W_hidden
-        self.network.W_output = (opposing_func_approx.network.W_output - self.network.W_output)*crossover + self.network.W_output
+        for weights, opposing, buffer in zip((self.network.W_hidden, self.network.W_output),
+                                             (opposing_func_approx.network.W_hidden, opposing_func_approx.network.W_output), self.buffers()):
+            np.subtract(opposing, weights, out=buffer)
+            buffer *= crossover
+            weights += buffer
+        self.clear_cache()
         
-    def value_of_state(self, state):
+    def evaluate_state(self, state):
         """
         Calculates the value of the given game state via the neural network.
         The state_function is used to convert the input into a suitable format for the network.
@@ -58,19 +225,61 @@ class CoEvo_Func_Approx(Func_Approx):
             state ([int]): The game state to be evaluated.
         Returns: A float which denotes the value of the given game state.
         """
-        input_state = self.state_function(state)
+        input_state = self.encode_states([state])[0]
         return self.network.feedforward(np.reshape(input_state, (1, len(input_state))))[0][0]
 
-    def add_noise(self, mean=0.0, sd=0.1):
+    def evaluate_states(self, states, base_state=None):
         """
-        Adds Guassian noise to all weights in the nerual network via the numpy.random.normal method.
+        Calculates the value of each of the given game states with a single pass through the neural network.
+        Each distinct input is only evaluated once, so that states with the same input always have exactly the same value,
+            as the result of a row of a matrix product can depend on its position in the matrix.
+        If the state_function has an active index equivalent, the weights of the active inputs are summed directly rather than multiplying the inputs.
+        If a base state is given, then the input to the hidden layer is only calculated in full for the base state,
+            and each state only adds the weights of the inputs that differ from it.
+            With only a few active inputs, such as one_hot_hand, summing every active input is faster and the base state is not used.
+        Args:
+            states ([[int]]): The game states to be evaluated.
+            base_state ([int]): A game state that all the states differ from in only a few positions. None by default.
+        Returns: A numpy array of floats which denote the value of each game state.
+        """
+        active = self.active_inputs(states)
+        if active is not None:
+            first, inverse = unique_rows(active)
+            if base_state is None or active.shape[1] < ACTIVE_DELTA_MIN_WIDTH:
+                return self.network.feedforward_active(active[first])[:, 0][inverse]
+            base_active = self.active_inputs([base_state])[0]
+            return self.network.feedforward_active_delta(base_active, active[first])[:, 0][inverse]
+
+        rows = {}
+        inverse = [rows.setdefault(tuple(self.state_function(state)), len(rows)) for state in states]
+        inputs = np.array(list(rows), dtype=float)
+        if base_state is None:
+            return self.network.feedforward(inputs)[:, 0][inverse]
+        base_input = np.array(self.state_function(base_state), dtype=float)
+        return self.network.feedforward_delta(base_input, inputs)[:, 0][inverse]
+
+    def add_noise(self, mean=0.0, sd=0.1, rng=None):
+        """
+        Adds Guassian noise to all weights in the nerual network.
+        The noise of a Generator is drawn into the buffers. The global numpy random state cannot draw in place,
+            so drawing from it allocates the noise and is kept only for players without a generator.
         Args:
             mean (float): The centre of the distribution. Default set to 0.0.
             sd (float): The standard deviation of the distribution. Default set to 0.1.
+            rng (numpy.random.Generator): The random generator of the noise. If None, the global numpy random state is used via numpy.random.normal.
         Returns: None
         """
-        self.network.W_hidden += np.random.normal(mean, sd, self.network.W_hidden.shape)
-        self.network.W_output += np.random.normal(mean, sd, self.network.W_output.shape)
+        if rng is None:
+            self.network.W_hidden += np.random.normal(mean, sd, self.network.W_hidden.shape)
+            self.network.W_output += np.random.normal(mean, sd, self.network.W_output.shape)
+            self.clear_cache()
+            return
+        for weights, buffer in zip((self.network.W_hidden, self.network.W_output), self.buffers()):
+            rng.standard_normal(out=buffer)
+            buffer *= sd
+            buffer += mean
+            weights += buffer
+        self.clear_cache()
 
 class NEAT_Func_Approx(Func_Approx):
     """
@@ -82,7 +291,7 @@ class NEAT_Func_Approx(Func_Approx):
     def __init__(self, state_function, network):
         super().__init__(state_function, network)
 
-    def value_of_state(self, state):
+    def evaluate_state(self, state):
         """
         Calculates the value of the given game state via the neural network.
         The state_function is used to convert the input into a suitable format for the network.
@@ -90,83 +299,237 @@ class NEAT_Func_Approx(Func_Approx):
             state ([int]): The game state to be evaluated.
         Returns: A float which denotes the value of the given game state.
         """
-        input_state = self.state_function(state)
+        input_state = self.encode_states([state])[0]
         return self.network.activate(input_state)[0] 
 
+    def evaluate_states(self, states, base_state=None):
+        """
+        Calculates the value of each of the given game states with a single pass through the NEAT network.
+        A Compiled_Network evaluates each layer for every state at once.
+        Otherwise each node of the network is evaluated for every state at once, in the same order as FeedForwardNetwork.activate.
+        Each distinct input is only evaluated once, so that states with the same input always have exactly the same value.
+        Args:
+            states ([[int]]): The game states to be evaluated.
+            base_state ([int]): Not used.
+        Returns: A numpy array of floats which denote the value of each game state.
+        """
+        inputs = self.encode_states(states)
+        if isinstance(self.network, Compiled_Network):
+            #Only the used inputs can change the value, so states which only differ in unused inputs have exactly the same value
+            inputs = inputs[:, self.network.used_inputs]
+            first, inverse = unique_rows(inputs)
+            return self.network.activate_used(inputs[first])[:, 0][inverse]
+
+        first, inverse = unique_rows(inputs)
+        inputs = inputs[first]
+
+        values = {node: np.zeros(len(inputs)) for node in self.network.values}
+        for i, node in enumerate(self.network.input_nodes):
+            values[node] = inputs[:, i]
+
+        for node, act_func, agg_func, bias, response, links in self.network.node_evals:
+            if agg_func is neat.aggregations.sum_aggregation:
+                #Sum the weighted inputs in the same order as the sum aggregation
+                s = np.zeros(len(inputs))
+                for i, w in links:
+                    s = s + values[i]*w
+            else:
+                node_inputs = np.array([values[i]*w for i, w in links]).reshape((len(links), len(inputs)))
+                s = np.array([agg_func(list(column)) for column in node_inputs.T], dtype=float)
+            z = bias + response*s
+            if act_func in NUMPY_ACTIVATIONS:
+                values[node] = NUMPY_ACTIVATIONS[act_func](z)
+            else:
+                values[node] = np.array([act_func(x) for x in z], dtype=float)
+
+        return values[self.network.output_nodes[0]][inverse]
+
+    def cache_keys(self, states):
+        """
+        Creates a compact key for each of the given game states from the input the network receives.
+        Only the used inputs of a Compiled_Network are included, as states which only differ in unused inputs have exactly the same value.
+        Args:
+            states ([[int]]): The game states.
+        Returns: A list of the bytes keys of each state.
+        """
+        if not isinstance(self.network, Compiled_Network):
+            return super().cache_keys(states)
+        return unique_keys(self.encode_states(states)[:, self.network.used_inputs])
+
+def unique_keys(array):
+    """
+    Converts each row of a 2D array into a bytes key, equal rows having equal keys.
+    Args:
+        array (numpy.ndarray): The 2D array.
+    Returns: A list of the bytes key of each row.
+    """
+    array = np.ascontiguousarray(array)
+    if array.shape[1] == 0:
+        return [b'']*len(array)
+    return array.view(np.dtype((np.void, array.dtype.itemsize*array.shape[1])))[:, 0].tolist()
+
+def unique_rows(array):
+    """
+    Finds the distinct rows of a 2D array.
+    Numpy operations on a batch can round the result of a row differently depending on its position,
+        so evaluating only the distinct rows ensures equal inputs always produce exactly equal values.
+    Args:
+        array (numpy.ndarray): The 2D array.
+    Returns: A tuple of the index of the first occurence of each distinct row, and the index of the distinct row of every row.
+    """
+    array = np.ascontiguousarray(array)
+    if array.shape[1] == 0:
+        #Every row is equal when there are no columns
+        return np.zeros(min(len(array), 1), dtype=np.intp), np.zeros(len(array), dtype=np.intp)
+    rows = array.view(np.dtype((np.void, array.dtype.itemsize*array.shape[1])))[:, 0]
+    _, first, inverse = np.unique(rows, return_index=True, return_inverse=True)
+    return first, inverse.reshape(-1)
+
 def one_hot_hand(state):
     """
     Converts the given game state into the one hot hand input representation.
     This input representation contains only in values of the cards in the player's hand using one hot encoding.
+    A thin wrapper of one_hot_hand_array, kept so that pickled players still load.
     Args:
         state([int]): The game state to be converted to the representation.
     Returns: An int array containing the new representation of the state.
     """
-    hand = [0]*(6*15)
-    for i in range(6):
-        try:
-            #Attempt to find each card in the players hand in the given game state
-            ind = state.index(i)
-            #If a card does, calculate its value and update the relevant element of the representation
-            if ind <= 51:
-                v = ind +1 - (ind//13)*13
-                hand[i*15 + v] = 1
-            else:
-                hand[i*15 + 14] = 1
-        #If the card is not in the player hand, update the relevant element of the representation
-        except ValueError:
-            hand[i*15] = 1
-    return hand
+    return one_hot_hand_array(state).tolist()
 
 def one_hot_state(state):
     """
     Converts the given game state into the one hot state input representation.
     This input representation denotes each card in the game and where it is located if known (values of -3 to 5) using one hot encoding.
+    A thin wrapper of one_hot_state_array, kept so that pickled players still load.
     Args:
         state([int]): The game state to be converted to the representation.
     Returns: An int array containing the new representation of the state.
     """
-    one_hot_state = []
-    for card_pos in state:
-        one_hot_card_pos = [0]*9
-        #Update index of array based on card location (values of -3 to 5)
-        one_hot_card_pos[card_pos] = 1
-        one_hot_state += one_hot_card_pos
-    return one_hot_state
+    return one_hot_state_array(state).tolist()
 
 def one_hot_state_and_hand(state):
     """
     Converts the given game state into the one hot state and hand input representation.
     This input representation denotes each card in the game and where it is located if known (values of -3 to 5) using one hot encoding.
     It makes use of the one hot hand representation to represent cards in the hand of the player.
+    A thin wrapper of one_hot_state_and_hand_array, kept so that pickled players still load.
     Args:
         state([int]): The game state to be converted to the representation.
     Returns: An int array containing the new representation of the state.
     """
-    opp, dis, unk, hand = [0]*54, [0]*54, [0]*54, [0]*(6*15)
-    
-    #Add each card in the opponents hand, discard pile, or uknown to the relevant arrays
-    for i in range(len(state)):
-        if state[i] == -3:
-            opp[i] = 1
-        elif state[i] == -2:
-            dis[i] = 1
-        elif state[i] == -1:
-            unk[i] = 1
-
-    for i in range(6):
-        try:
-            #Attempt to find each card in the players hand in the given game state
-            ind = state.index(i)
-            #If a card does, calculate its value and update the relevant element of the representation
-            if ind <= 51:
-                v = ind +1 - (ind//13)*13
-                hand[i*15 + v] = 1
-            else:
-                hand[i*15 + 14] = 1
-        #If the card is not in the player hand, update the relevant element of the representation
-        except ValueError:
-            hand[i*15] = 1
-    
-    #Recombine separate arrays to form full input
-    input_state = opp + dis + unk + hand
-    return input_state
\ No newline at end of file
+    return one_hot_state_and_hand_array(state).tolist()
+
+#The input of the one hot hand representation for the value of each card, jokers having the final input
+#The extra final element is the input of a position of the hand with no known card
+HAND_VALUE_INPUTS = np.array([ind % 13 + 1 for ind in range(52)] + [14, 14, 0])
+#The first input of each card in the one hot state representation
+STATE_CARD_INPUTS = np.arange(54)*9
+
+def _active_hand(states, offset=0):
+    """
+    Calculates the active inputs of the one hot hand representation for a batch of game states.
+    Args:
+        states (numpy.ndarray): A (M, 54) array of the game states.
+        offset (int): The index of the first input of the representation.
+    Returns: A (M, 6) int array of the active inputs, one for each card in the player's hand.
+    """
+    #Find the card in each position of the player's hand, 54 if the position has no known card
+    positions = np.full((len(states), 6), 54)
+    #Reversed so that the first card is kept if a position occurs more than once, as state.index does
+    flat = np.flatnonzero(states.ravel() >= 0)[::-1]
+    rows, cards = np.divmod(flat, 54)
+    positions[rows, states.ravel()[flat]] = cards
+    v = HAND_VALUE_INPUTS[positions]
+    return offset + np.arange(6)*15 + v
+
+def one_hot_hand_active(states):
+    """
+    The active index equivalent of one_hot_hand, converting a batch of game states at once.
+    Args:
+        states (numpy.ndarray): A (M, 54) array of the game states to be converted.
+    Returns: A (M, 6) int array containing the indexes of the inputs which are one.
+    """
+    return _active_hand(states)
+
+def one_hot_state_active(states):
+    """
+    The active index equivalent of one_hot_state, converting a batch of game states at once.
+    Args:
+        states (numpy.ndarray): A (M, 54) array of the game states to be converted.
+    Returns: A (M, 54) int array containing the indexes of the inputs which are one.
+    """
+    #Negative locations index from the end of each card's inputs, as in one_hot_state
+    return STATE_CARD_INPUTS + states % 9
+
+def one_hot_state_and_hand_active(states):
+    """
+    The active index equivalent of one_hot_state_and_hand, converting a batch of game states at once.
+    Args:
+        states (numpy.ndarray): A (M, 54) array of the game states to be converted.
+    Returns: A (M, 60) int array containing the indexes of the inputs which are one, padded with -1.
+    """
+    #Cards in the opponents hand, discard pile, or unknown are in the first, second, and third 54 inputs respectively
+    located = np.where(states < 0, (states + 3)*54 + np.arange(54), -1)
+    return np.concatenate([located, _active_hand(states, 3*54)], axis=1)
+
+def _one_hot_array(active_function, n_input, states):
+    """
+    Converts one game state or a batch of game states to a one hot representation, using the active index equivalent of the representation.
+    Args:
+        active_function (function): The active index equivalent of the representation.
+        n_input (int): The number of inputs of the representation.
+        states ([int] or numpy.ndarray): A single game state or a (M, 54) array of game states.
+    Returns: An int8 array of shape (n_input,) for a single state, or (M, n_input) for a batch.
+    """
+    states = np.asarray(states)
+    batch = states.reshape((-1, 54))
+    active = active_function(batch)
+    #The extra final column collects the padding of the active inputs
+    inputs = np.zeros((len(batch), n_input + 1), dtype=np.int8)
+    inputs[np.arange(len(batch))[:, None], active] = 1
+    inputs = inputs[:, :-1]
+    return inputs[0] if states.ndim == 1 else inputs
+
+def one_hot_hand_array(states):
+    """
+    Converts one game state or a batch of game states into the one hot hand input representation as an array.
+    Args:
+        states ([int] or numpy.ndarray): A single game state or a (M, 54) array of game states.
+    Returns: An int8 array of shape (90,) for a single state, or (M, 90) for a batch.
+    """
+    return _one_hot_array(one_hot_hand_active, 6*15, states)
+
+def one_hot_state_array(states):
+    """
+    Converts one game state or a batch of game states into the one hot state input representation as an array.
+    Args:
+        states ([int] or numpy.ndarray): A single game state or a (M, 54) array of game states.
+    Returns: An int8 array of shape (486,) for a single state, or (M, 486) for a batch.
+    """
+    return _one_hot_array(one_hot_state_active, 54*9, states)
+
+def one_hot_state_and_hand_array(states):
+    """
+    Converts one game state or a batch of game states into the one hot state and hand input representation as an array.
+    Args:
+        states ([int] or numpy.ndarray): A single game state or a (M, 54) array of game states.
+    Returns: An int8 array of shape (252,) for a single state, or (M, 252) for a batch.
+    """
+    return _one_hot_array(one_hot_state_and_hand_active, 3*54 + 6*15, states)
+
+#The active index equivalents of the state functions, allowing batches of states to be evaluated without dense inputs
+ACTIVE_STATE_FUNCTIONS = {
+    one_hot_hand: one_hot_hand_active,
+    one_hot_state: one_hot_state_active,
+    one_hot_state_and_hand: one_hot_state_and_hand_active,
+}
+
+#The array equivalents of the state functions, which convert one game state or a batch of game states
+ARRAY_STATE_FUNCTIONS = {
+    one_hot_hand: one_hot_hand_array,
+    one_hot_state: one_hot_state_array,
+    one_hot_state_and_hand: one_hot_state_and_hand_array,
+}
+
+#The state functions whose inputs only depend on the rank of each card, not its suit
+SUIT_INVARIANT_STATE_FUNCTIONS = {one_hot_hand}
@@ -0,0 +1,249 @@
+"""
+---game_log.py---
+Contains the Game_Log_Writer class, which appends game histories to game files as the games are played,
+    rather than the training and evaluation scripts building every game of a batch into a single string.
+The game files keep the same text format, each game being the histories of its rounds followed by a blank line,
+    and the same naming, the time the file was started followed by a suffix such as the position of the player in a pair of games.
+Game files can optionally be compressed with gzip, lzma, or zstd (if the zstandard package is installed),
+    and the games of any game file are read back one at a time by read_games, without loading the whole file.
+"""
+import os
+import io
+import glob
+import gzip
+import lzma
+import time
+import queue
+import threading
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+#The extension of the game files written with each compression
+COMPRESSION_EXTENSIONS = {None: ".txt", "gzip": ".txt.gz", "lzma": ".txt.xz", "zstd": ".txt.zst"}
+
+def open_game_file(path, mode='rt'):
+    """
+    Opens a game file as text, decompressing or compressing it according to its extension.
+    Appending to a compressed file adds a new compressed member after the existing ones, which are all read back as a single file.
+    Args:
+        path (String): The path of the game file.
+        mode (String): Either 'rt' to read the file or 'at' to append to it. 'rt' by default.
+    Returns: A text file object
+    """
+    if path.endswith(".gz"):
+        return gzip.open(path, mode, compresslevel=6)
+    if path.endswith(".xz"):
+        return lzma.open(path, mode)
+    if path.endswith(".zst"):
+        if zstandard is None:
+            raise ImportError("The zstandard package is required for zstd compressed game files")
+        f = open(path, mode.replace('t', 'b'))
+        if 'r' in mode:
+            stream = zstandard.ZstdDecompressor().stream_reader(f, read_across_frames=True, closefd=True)
+        else:
+            stream = zstandard.ZstdCompressor().stream_writer(f, closefd=True)
+        return io.TextIOWrapper(stream)
+    return open(path, mode)
+
+def read_games(path):
+    """
+    Reads the games of a game file one at a time, only holding a single game in memory.
+    Args:
+        path (String): The path of the game file, which may be compressed.
+    Returns: A generator of the history of each game, the history of each round followed by a new line.
+    """
+    #Files that were created but never written to are empty, even when compressed
+    if os.path.getsize(path) == 0:
+        return
+    with open_game_file(path) as f:
+        lines = []
+        for line in f:
+            if line == '\n':
+                yield "".join(lines)
+                lines = []
+            else:
+                lines.append(line)
+
+def game_files(dir_path):
+    """
+    Finds all game files in a directory, of any compression.
+    The files are sorted by name, which orders them by the time they were started and keeps the files of a pair of games together.
+    Args:
+        dir_path (String): The path of the directory containing the game files.
+    Returns: A sorted list of the paths of the game files
+    """
+    return sorted(path for extension in set(COMPRESSION_EXTENSIONS.values()) for path in glob.glob('%s/*%s' % (dir_path, extension)))
+
+class Game_Log_Writer():
+    """
+    Appends the games of one or more streams, such as the two positions of a pair of games, to a shard file for each stream.
+    Games are held in a bounded buffer, which is appended to the shards whenever it is full, either directly or by a background thread.
+    After games_per_shard games, the shards are completed and the next game starts a new shard of every stream.
+    Shards are named "%Y%m%d-%H%M%S-<suffix>.txt" from the time they are started, followed by ".gz", ".xz" or ".zst" if the games are compressed.
+    If a shard of that name already exists, for example when two shards are started in the same second,
+        a sequence number is added to the time ("%Y%m%d-%H%M%S.001-<suffix>.txt"), so the shards of each stream still sort in the order they were started.
+    Attributes:
+        dir_path (String): The path of the directory the shards are written to.
+        suffixes ([String]): The suffix of the shard of each stream.
+        games_per_shard (int): The number of games of each stream in a shard, None if there is only a single shard.
+        buffer_size (int): The number of characters held in the buffer before it is appended to the shards.
+        compression (String): The compression of the shards, one of the keys of COMPRESSION_EXTENSIONS. None if the shards are not compressed.
+        paths ([String]): The paths of the current shard of each stream, None if the next game starts a new shard.
+        num_games (int): The number of games of each stream written to the current shard.
+    """
+    def __init__(self, dir_path, suffixes=("0", "1"), games_per_shard=None, buffer_size=1048576, background=False, compression=None):
+        if compression not in COMPRESSION_EXTENSIONS:
+            raise ValueError("Compression must be one of %s" % ", ".join(map(str, COMPRESSION_EXTENSIONS)))
+        if compression == "zstd" and zstandard is None:
+            raise ImportError("The zstandard package is required for zstd compressed game files")
+        self.dir_path = dir_path
+        self.compression = compression
+        self.suffixes = [str(suffix) for suffix in suffixes]
+        self.games_per_shard = games_per_shard
+        self.buffer_size = buffer_size
+        self.paths = None
+        self.num_games = 0
+        self._buffers = [[] for _ in self.suffixes]
+        self._buffered = 0
+        self._queue = None
+        self._error = None
+        if background:
+            #The queue is bounded, so if the disk is slower than the games the writer waits instead of holding more buffers
+            self._queue = queue.Queue(maxsize=2)
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _new_shard(self):
+        """
+        Creates the empty files of a new shard of every stream, adding a sequence number to the time if any of the names are taken.
+        Returns: The paths of the new files ([String])
+        """
+        start = time.strftime("%Y%m%d-%H%M%S", time.gmtime())
+        sequence = 0
+        while True:
+            prefix = start if sequence == 0 else "%s.%03d" % (start, sequence)
+            paths = [os.path.join(self.dir_path, "%s-%s%s" % (prefix, suffix, COMPRESSION_EXTENSIONS[self.compression])) for suffix in self.suffixes]
+            created = []
+            try:
+                for path in paths:
+                    #Exclusive creation claims the name, even against other processes writing to the same directory
+                    open(path, 'x').close()
+                    created.append(path)
+                return paths
+            except FileExistsError:
+                for path in created:
+                    os.remove(path)
+                sequence += 1
+
+    def write(self, games):
+        """
+        Adds a game of every stream to the log.
+        Args:
+            games ([String]): The history of the game of each stream, the history of each round followed by a new line.
+        Returns: None
+        """
+        self._check()
+        if self.paths is None:
+            self.paths = self._new_shard()
+        for buffer, game in zip(self._buffers, games):
+            buffer.append(game + '\n')
+            self._buffered += len(game) + 1
+        self.num_games += 1
+
+        shard_full = self.games_per_shard is not None and self.num_games >= self.games_per_shard
+        if shard_full or self._buffered >= self.buffer_size:
+            self._submit()
+        if shard_full:
+            self.paths = None
+            self.num_games = 0
+
+    def flush(self):
+        """
+        Appends the buffered games to the current shards, and with a background thread waits until it has appended every game given to it,
+            so that all games written so far are in the shards when it returns.
+        Returns: None
+        """
+        self._submit()
+        if self._queue is not None:
+            self._queue.join()
+        self._check()
+
+    def _submit(self):
+        """
+        Appends the buffered games to the current shards. With a background thread, the games are appended once the thread reaches them.
+        Returns: None
+        """
+        self._check()
+        if self._buffered == 0:
+            return
+        chunks = ["".join(buffer) for buffer in self._buffers]
+        self._buffers = [[] for _ in self.suffixes]
+        self._buffered = 0
+        if self._queue is None:
+            self._append(self.paths, chunks)
+        else:
+            self._queue.put((self.paths, chunks))
+
+    def close(self):
+        """
+        Appends any buffered games and waits for the background thread to finish writing.
+        Returns: None
+        """
+        try:
+            self.flush()
+        finally:
+            #The thread is stopped even if writing failed
+            if self._queue is not None:
+                self._queue.put(None)
+                self._thread.join()
+                self._queue = None
+        self._check()
+
+    def _append(self, paths, chunks):
+        """
+        Appends a chunk of games to the file of each stream.
+        Args:
+            paths ([String]): The path of the shard of each stream.
+            chunks ([String]): The games of each stream.
+        Returns: None
+        """
+        for path, chunk in zip(paths, chunks):
+            with open_game_file(path, 'at') as f:
+                f.write(chunk)
+
+    def _run(self):
+        """
+        Appends the chunks of games put on the queue until None is received. The first error is raised by the next call to the writer.
+        Returns: None
+        """
+        while True:
+            item = self._queue.get()
+            if item is None:
+                self._queue.task_done()
+                break
+            try:
+                if self._error is None:
+                    self._append(*item)
+            except Exception as e:
+                #Any error is kept rather than ending the thread, which would leave flush waiting for the queue forever
+                self._error = e
+            finally:
+                self._queue.task_done()
+
+    def _check(self):
+        """
+        Raises any error from the background thread in the thread using the writer.
+        Returns: None
+        """
+        if self._error is not None:
+            error, self._error = self._error, None
+            raise error
@@ -7,8 +7,6 @@ The Golf_analyser class contains all methods for extracting, analysing and plott
 from operator import add
 import random
 import time
-import copy
-import glob
 import os
 import itertools
 import numpy as np
@@ -16,6 +14,7 @@ import matplotlib.pyplot as plt
 from operator import add
 
 from deck import Deck
+from game_log import game_files, read_games
 from actions import Actions
 
 class Golf():
@@ -33,7 +32,9 @@ class Golf():
     def initialise(self, stock=None):
         """
         Initialises/Resets the deck and discard pile.
-        If a deck has been specified (via the stock argument) then a deep copy is made, else a new deck is created.
+        If a deck has been specified (via the stock argument) then a copy is made, else a new deck is created.
+        The copy is made by creating new cards of the same value and suit, which is far cheaper than copy.deepcopy.
+        As cards are drawn with their hidden attribute set, the copy behaves identically to a deep copy.
         Args:
             stock (Deck): The deck to initialise the game with, set to None by default.
         Returns: None
@@ -42,7 +43,7 @@ class Golf():
         if stock is None:
             self.stock = Deck(deck=[], jokers=True)
         else:
-            self.stock = copy.deepcopy(stock)
+            self.stock = Deck([Deck.Card(card.value, card.suit) for card in stock.deck], stock.jokers)
 
     def init_hand(self):
         """
@@ -237,6 +238,7 @@ class Golf():
         self.discard_pile.append(self.stock.draw())
 
         GAME_HISTORY += '<'
+        turn_counts = {}
 
         #Turns of the round
         while not self.has_finished(PLAYERS[turn]):
@@ -269,8 +271,11 @@ class Golf():
 
             turn = turn + 1 if turn + 1 < len(PLAYERS) else 0
             
-            #Check for cycles in the game using String.count(substring, start, end)
-            if GAME_HISTORY.count(GAME_HISTORY[-4:]) > 5:
+            #Check for cycles in the game by counting the occurences of each turn.
+            #As turns are the only part of the history containing '+' or '-', this is equal to counting the substring in GAME_HISTORY
+            token = GAME_HISTORY[-4:]
+            turn_counts[token] = turn_counts.get(token, 0) + 1
+            if turn_counts[token] > 5:
                 break
 
             #Recycle stock if empty
@@ -468,7 +473,7 @@ class Golf_Analyser():
         Returns: A nested list containing all of the mean scores of both players 
         """
         #Retreive the path of all game files in the directory
-        files = glob.glob('%s/*.txt' % dir_path)
+        files = game_files(dir_path)
         data = []
 
         #Open the files in pairs which will allow for the games to be stored in chronological order of when they were played
@@ -477,16 +482,12 @@ class Golf_Analyser():
             scores_0, scores_1 = [],[]
             
             #Extract the scores from the first file
-            with open(pair[0], 'r') as f0:
-                games_0 = f0.read().split('\n\n')[:-1]
-            for game in games_0:
-                scores_0.append(Golf_Analyser.extract_scores(game + '\n'))
+            for game in read_games(pair[0]):
+                scores_0.append(Golf_Analyser.extract_scores(game))
             
             #Extract and reverses the order of the scores from the second file
-            with open(pair[1], 'r') as f1:
-                games_1 = f1.read().split('\n\n')[:-1]
-            for game in games_1:
-                scores_1.append(Golf_Analyser.extract_scores(game + '\n')[::-1])
+            for game in read_games(pair[1]):
+                scores_1.append(Golf_Analyser.extract_scores(game)[::-1])
 
             #Collate the scores together such that they are in chronological order
             scores = [s for s in itertools.chain.from_iterable(zip(scores_0, scores_1))]
@@ -509,7 +510,7 @@ class Golf_Analyser():
         Returns: A nested list containing all of the mean number of matches of both players 
         """
         #Retreive the path of all game files in the directory
-        files = glob.glob('%s/*.txt' % dir_path)
+        files = game_files(dir_path)
         data = []
 
         #Open the files in pairs which will allow for the games to be stored in chronological order of when they were played
@@ -518,16 +519,12 @@ class Golf_Analyser():
             hands_0, hands_1 = [],[]
             
             #Extract the hands from the first file
-            with open(pair[0], 'r') as f0:
-                games_0 = f0.read().split('\n\n')[:-1]
-            for game in games_0:
-                hands_0 += Golf_Analyser.extract_hands(game + '\n')
+            for game in read_games(pair[0]):
+                hands_0 += Golf_Analyser.extract_hands(game)
             
             #Extract and reverses the order of the hands from the second file
-            with open(pair[1], 'r') as f1:
-                games_1 = f1.read().split('\n\n')[:-1]
-            for game in games_1:
-                tmp_hands = Golf_Analyser.extract_hands(game + '\n')
+            for game in read_games(pair[1]):
+                tmp_hands = Golf_Analyser.extract_hands(game)
                 hands_1 += [h[::-1] for h in tmp_hands]
 
             #Collate the hands together such that they are in chronological order
@@ -560,7 +557,7 @@ class Golf_Analyser():
         Returns: A nested list containing the average number of turns made per round 
         """
         #Retreive the path of all game files in the directory
-        files = glob.glob('%s/*.txt' % dir_path)
+        files = game_files(dir_path)
         data = []
 
         #Open the files in pairs which will allow for the games to be stored in chronological order of when they were played
@@ -569,16 +566,12 @@ class Golf_Analyser():
             turns_0, turns_1 = [],[]
             
             #Extract the number of turns from the first file
-            with open(pair[0], 'r') as f0:
-                games_0 = f0.read().split('\n\n')[:-1]
-            for game in games_0:
-                turns_0 += Golf_Analyser.extract_number_of_turns(game + '\n')
+            for game in read_games(pair[0]):
+                turns_0 += Golf_Analyser.extract_number_of_turns(game)
             
             #Extract the number of turns from the second file
-            with open(pair[1], 'r') as f1:
-                games_1 = f1.read().split('\n\n')[:-1]
-            for game in games_1:
-                turns_1 += Golf_Analyser.extract_number_of_turns(game + '\n')
+            for game in read_games(pair[1]):
+                turns_1 += Golf_Analyser.extract_number_of_turns(game)
 
             #Collate the number of turns together such that they are in chronological order
             turns = [t for t in itertools.chain.from_iterable(zip(turns_0, turns_1))]
@@ -600,7 +593,7 @@ class Golf_Analyser():
         Returns: A nested list containing the number of rounds ended by each player 
         """
         #Retreive the path of all game files in the directory
-        files = glob.glob('%s/*.txt' % dir_path)
+        files = game_files(dir_path)
         data = []
 
         #Open the files in pairs which will allow for the games to be stored in chronological order of when they were played
@@ -609,16 +602,12 @@ class Golf_Analyser():
             end_0, end_1 = [],[]
             
             #Extract the number of rounds ended from the first file
-            with open(pair[0], 'r') as f0:
-                games_0 = f0.read().split('\n\n')[:-1]
-            for game in games_0:
-                end_0 += Golf_Analyser.extract_rounds_ended(game + '\n')
+            for game in read_games(pair[0]):
+                end_0 += Golf_Analyser.extract_rounds_ended(game)
             
             #Extract and reverses the order of the number of rounds ended from the second file
-            with open(pair[1], 'r') as f1:
-                games_1 = f1.read().split('\n\n')[:-1]
-            for game in games_1:
-                tmp_ends = Golf_Analyser.extract_rounds_ended(game + '\n')[0]
+            for game in read_games(pair[1]):
+                tmp_ends = Golf_Analyser.extract_rounds_ended(game)[0]
                 end_1 += [tmp_ends[:-1][::-1] + tmp_ends[-1:]]
 
             #Collate the number of rounds ended together such that they are in chronological order
@@ -644,7 +633,7 @@ class Golf_Analyser():
         Returns: A tuple of two lists containing the frequency of cards of each players 
         """
         #Retreive the path of all game files in the directory
-        files = glob.glob('%s/*.txt' % dir_path)
+        files = game_files(dir_path)
         data_0, data_1 = [], []
 
         #Open the files in pairs which will allow for the games to be stored in chronological order of when they were played
@@ -653,16 +642,12 @@ class Golf_Analyser():
             hands_0, hands_1 = [],[]
             
             #Extract the hands from the first file
-            with open(pair[0], 'r') as f0:
-                games_0 = f0.read().split('\n\n')[:-1]
-            for game in games_0:
-                hands_0 += Golf_Analyser.extract_hands(game + '\n')
+            for game in read_games(pair[0]):
+                hands_0 += Golf_Analyser.extract_hands(game)
             
             #Extract and reverses the order of the hands from the second file
-            with open(pair[1], 'r') as f1:
-                games_1 = f1.read().split('\n\n')[:-1]
-            for game in games_1:
-                tmp_hands = Golf_Analyser.extract_hands(game + '\n')
+            for game in read_games(pair[1]):
+                tmp_hands = Golf_Analyser.extract_hands(game)
                 hands_1 += [h[::-1] for h in tmp_hands]
 
             #Collate the hands together such that they are in chronological order
@@ -0,0 +1,84 @@
+"""
+---island_train_env.py---
+An environment for training players with many independent runs of the coevolution algorithm in parallel, known as islands.
+Each island is a player and opponent pair trained in the same manner as coevo_train_env, with its own random generator
+    for its games and noise, and is trained for MIGRATION_INTERVAL epochs at a time by a pool of worker processes.
+After each interval, the player of every island plays the same BENCHMARK_PAIRS pairs of games against the greedy player,
+    and the player of the best island is copied into the opponents of the worst islands, so that the other islands train against it.
+All islands are then serialised to a single checkpoint which is replaced atomically, along with the best player in the same format as coevo_train_env.
+
+Args:
+    DIR_PATH (String): First command line argument. The path of the directory where the checkpoint exists or is to be saved.
+    STATE_FUNCTION (String): Second command line argument. The name of the function approximator used by the players.
+        Must be one of either "one_hot_hand", "one_hot_state_and_hand", or "one_hot_state". Only used when no checkpoint exists in DIR_PATH
+    NUM_ISLANDS (int): Optional third command line argument. The number of islands, one for each core by default. Only used when no checkpoint exists in DIR_PATH
+"""
+import pickle
+import os
+import sys
+import queue
+import threading
+import multiprocessing
+import numpy as np
+
+from islands import Island, train_island, migrate, save_atomic
+from coevo_train_env import check_exit
+import function_approximator as fa
+
+MIGRATION_INTERVAL = 25
+BENCHMARK_PAIRS = 10
+
+if __name__ == '__main__':
+    #Handles command line arguments
+    DIR_PATH = sys.argv[1]
+    STATE_FUNCTIONS = {"one_hot_hand": fa.one_hot_hand, "one_hot_state_and_hand": fa.one_hot_state_and_hand, "one_hot_state": fa.one_hot_state}
+    if sys.argv[2] not in STATE_FUNCTIONS:
+        raise AttributeError("Input representation must be either one_hot_hand, one_hot_state_and_hand, or one_hot_state")
+    STATE_FUNCTION = STATE_FUNCTIONS[sys.argv[2]]
+    NUM_ISLANDS = int(sys.argv[3]) if len(sys.argv) > 3 else os.cpu_count()
+
+    if not os.path.exists(DIR_PATH):
+        os.makedirs(DIR_PATH)
+
+    #Search given directory for the checkpoint of the islands. Load if it exists, create new islands with independent seeds if it does not
+    try:
+        with open(os.path.join(DIR_PATH, 'ISLANDS_PICKLE.p'), 'rb') as f:
+            checkpoint = pickle.load(f)
+    except FileNotFoundError:
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+        #The islands and the benchmarks draw from separate children of the seed, so no benchmark games share a seed stream with an island
+        islands_seed, benchmark_seed = np.random.SeedSequence(seed).spawn(2)
+        checkpoint = {"seed": seed, "interval": 0, "benchmark_seed": benchmark_seed,
+                      "islands": [Island(STATE_FUNCTION, s) for s in islands_seed.spawn(NUM_ISLANDS)]}
+    islands = checkpoint["islands"]
+    #Checkpoints without a benchmark seed spawned their islands directly from the seed, the next unused child is kept for the benchmarks
+    benchmark_seed = checkpoint.setdefault("benchmark_seed", np.random.SeedSequence(checkpoint["seed"], spawn_key=(len(islands),)))
+
+    #The worker processes are started before the input thread, as they close their copy of stdin which the thread holds while reading
+    with multiprocessing.Pool(min(len(islands), os.cpu_count())) as pool:
+        #initialise parameters to monitor user input
+        run = True
+        input_queue = queue.Queue()
+        #Daemon means thread will stop running once main program terminates
+        input_thread = threading.Thread(target=check_exit, args=(input_queue,), daemon=True)
+        input_thread.start()
+
+        ##TRAINING##
+        while run:
+            #Every island is benchmarked on the same games, which change each interval
+            seeds = np.random.SeedSequence(benchmark_seed.entropy, spawn_key=benchmark_seed.spawn_key + (checkpoint["interval"],)).generate_state(BENCHMARK_PAIRS)
+            islands = pool.map(train_island, [(island, MIGRATION_INTERVAL, seeds) for island in islands], chunksize=1)
+            checkpoint["islands"] = islands
+            checkpoint["interval"] += 1
+
+            for k, island in enumerate(islands):
+                print("Island %d: %d epochs, mean margin over greedy player: %.2f" % (k, island.epochs, island.benchmark))
+            best = migrate(islands)
+            print("Migrated the player of island %d\n" % islands.index(best))
+
+            #Serialise all islands, and the best player so that it can be used with play_players
+            save_atomic(checkpoint, os.path.join(DIR_PATH, 'ISLANDS_PICKLE.p'))
+            save_atomic(best.player, os.path.join(DIR_PATH, 'PLAYER_PICKLE.p'))
+
+            #Detect if user has entered "exit"
+            run = input_queue.empty()
@@ -0,0 +1,103 @@
+"""
+---islands.py---
+Contains the Island class, a single run of the coevolution algorithm with its own random generator that can be trained in a worker process,
+    and the methods used by island_train_env to benchmark the islands and migrate players between them.
+"""
+import pickle
+import os
+import numpy as np
+
+from compact_golf import Compact_Golf, Round_Result
+from player import Golf_Player, Greedy_Golf_Player
+from function_approximator import CoEvo_Func_Approx
+from coevo_train_env import play_epoch, coevolve, NUM_PAIRS
+
+#The fraction of the islands, those with the worst benchmark, whose opponents are replaced by the best player at each migration
+MIGRATION_FRACTION = 0.5
+
+class Island():
+    """
+    A single run of the coevolution algorithm, which can be sent to a worker process to be trained.
+    Attributes:
+        player, opponent (Golf_Player): The two players being trained.
+        rng (numpy.random.Generator): The random generator of the initial weights of the players, the seeds of the games and the noise added to the players.
+        epochs (int): The number of epochs the island has been trained for.
+        benchmark (float): The mean amount the player beat the greedy player by per game at the last benchmark, None before the first.
+    """
+    def __init__(self, state_function, seed):
+        self.rng = np.random.default_rng(seed)
+        #The initial weights are also drawn from the island's generator, so that an island is reproducible from its seed
+        self.player = Golf_Player(state_function, CoEvo_Func_Approx(27, state_function, self.rng))
+        self.opponent = Golf_Player(state_function, CoEvo_Func_Approx(27, state_function, self.rng))
+        self.opponent.add_noise(rng=self.rng)
+        self.epochs = 0
+        self.benchmark = None
+
+    def train(self, num_epochs):
+        """
+        Trains the player and opponent for a number of epochs, the game histories are not recorded.
+        Args:
+            num_epochs (int): The number of epochs to train for.
+        Returns: None
+        """
+        g = Compact_Golf()
+        for _ in range(num_epochs):
+            total_scores = play_epoch(g, self.player, self.opponent, seeds=self.rng.integers(0, 2147483648, size=NUM_PAIRS))
+            coevolve(self.player, self.opponent, total_scores, self.rng)
+            self.epochs += 1
+
+    def score(self, seeds):
+        """
+        Plays a pair of games against the greedy player for each seed and sets the benchmark of the island.
+        Args:
+            seeds ([int]): The seed of each pair of games, the same for every island.
+        Returns: The benchmark (float)
+        """
+        g = Compact_Golf()
+        greedy_player = Greedy_Golf_Player()
+        margin = 0
+        for seed in seeds:
+            results_1, results_2 = g.play_pair_results(self.player, greedy_player, seed=seed)
+            scores_1, scores_2 = Round_Result.total_scores(results_1), Round_Result.total_scores(results_2)
+            margin += (scores_1[1] - scores_1[0]) + (scores_2[0] - scores_2[1])
+        self.benchmark = margin/(2*len(seeds))
+        return self.benchmark
+
+def train_island(task):
+    """
+    Trains an island for an interval in a worker process and benchmarks its player.
+    Args:
+        task ((Island, int, [int])): The island, the number of epochs to train for, and the seeds of the benchmark games.
+    Returns: The trained island (Island)
+    """
+    island, num_epochs, seeds = task
+    island.train(num_epochs)
+    island.score(seeds)
+    return island
+
+def migrate(islands):
+    """
+    Copies the player of the island with the best benchmark into the opponents of the islands with the worst benchmarks.
+    Args:
+        islands ([Island]): The benchmarked islands.
+    Returns: The best island (Island)
+    """
+    order = np.argsort([island.benchmark for island in islands], kind='stable')
+    best = islands[order[-1]]
+    for k in order[:min(int(len(islands)*MIGRATION_FRACTION), len(islands) - 1)]:
+        islands[k].opponent.copy_from(best.player)
+    return best
+
+def save_atomic(obj, path):
+    """
+    Serialises an object to a temporary file and then replaces the file at path with it,
+        so that the file is never left partially written if the training is stopped.
+    Args:
+        obj (object): The object to be serialised.
+        path (String): The path of the file.
+    Returns: None
+    """
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(obj, f)
+    os.replace(tmp_path, path)
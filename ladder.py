@@ -0,0 +1,238 @@
+"""
+---ladder.py---
+A rating ladder of many saved players, using the Elo rating system.
+The ratings are kept in a persistent JSON table so that new players can be added at any time without replaying old games.
+Rather than a full round robin, the most informative matchups are scheduled each round,
+    these are the matchups between players with close ratings and few games played.
+The matchups are played in parallel and the ratings are updated after every game.
+Args:
+    LADDER_PATH (String): First command line argument. The path of the JSON file containing the ladder.
+    COMMAND (String): Second command line argument. One of "add", "run" or "show".
+        add: Adds players with the options --coevo DIR, --neat DIR, --neat-generations DIR (every best solution of a run) and --baselines.
+        run: Plays --rounds rounds of --matchups matchups, each of --pairs pairs of games, using --workers processes.
+        show: Displays the ratings of all players.
+"""
+import os
+import sys
+import glob
+import json
+import math
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from tournament import play_matchups
+
+INITIAL_RATING = 1500.0
+K_FACTOR = 16.0
+
+class Ladder():
+    """
+    Contains all methods and attributes to maintain an Elo rating ladder of players.
+    Attributes:
+        path (String): The path of the JSON file the ladder is saved to.
+        players (dict): Maps the name of each player to its spec (flag and path, as given to extract_player), rating and number of games.
+        matchups (dict): Maps each pair of player names, joined by '|', to the number of games played between them.
+        seed (int): The seed of the ladder, from which the seed of every pair of games is drawn.
+        num_played (int): The number of pairs of games played, ensuring each pair of games has a unique seed.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.players = {}
+        self.matchups = {}
+        self.seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self.num_played = 0
+        if os.path.exists(path):
+            with open(path, 'r') as f:
+                data = json.load(f)
+            self.players = data["players"]
+            self.matchups = data["matchups"]
+            self.seed = data["seed"]
+            self.num_played = data["num_played"]
+
+    def save(self):
+        """
+        Saves the ladder to its JSON file.
+        The file is written to a temporary file first and then replaced, so the ladder is never left partially written.
+        Returns: None
+        """
+        data = {"players": self.players, "matchups": self.matchups, "seed": self.seed, "num_played": self.num_played}
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=1, sort_keys=True)
+        os.replace(tmp_path, self.path)
+
+    def add_player(self, name, flag, path):
+        """
+        Adds a player to the ladder with the initial rating. Players already in the ladder are not changed.
+        Args:
+            name (String): The unique name of the player.
+            flag, path (String): The flag and path of the player, as given to extract_player.
+        Returns: None
+        """
+        if name not in self.players:
+            self.players[name] = {"flag": flag, "path": path, "rating": INITIAL_RATING, "games": 0}
+
+    def spec(self, name):
+        """
+        Returns the flag and path of a player, as given to extract_player.
+        Args:
+            name (String): The name of the player.
+        Returns: A tuple of the flag and path of the player.
+        """
+        return (self.players[name]["flag"], self.players[name]["path"])
+
+    @staticmethod
+    def expected_score(rating_a, rating_b):
+        """
+        Calculates the expected score of player a against player b under the Elo rating system.
+        Args:
+            rating_a, rating_b (float): The ratings of the players.
+        Returns: A float between 0 and 1, the probability of player a winning (draws counting as half).
+        """
+        return 1.0/(1.0 + 10**((rating_b - rating_a)/400.0))
+
+    def information(self, name_a, name_b):
+        """
+        Estimates how informative a matchup between two players would be.
+        Matchups are more informative the closer the expected score is to 0.5,
+            and the fewer games the players have played both overall and against each other.
+        Args:
+            name_a, name_b (String): The names of the players.
+        Returns: A non-negative float, higher values being more informative.
+        """
+        a, b = self.players[name_a], self.players[name_b]
+        p = self.expected_score(a["rating"], b["rating"])
+        uncertainty = 1.0/math.sqrt(1 + a["games"]) + 1.0/math.sqrt(1 + b["games"])
+        return p*(1 - p)*uncertainty/math.sqrt(1 + self.matchups.get(self.key(name_a, name_b), 0))
+
+    @staticmethod
+    def key(name_a, name_b):
+        """
+        Returns the key of a matchup in the matchups dictionary, which is independent of the order of the players.
+        Args:
+            name_a, name_b (String): The names of the players.
+        Returns: A String key.
+        """
+        return "|".join(sorted([name_a, name_b]))
+
+    def schedule(self, num_matchups):
+        """
+        Chooses the most informative matchups to play next.
+        Each matchup is chosen greedily, after which the number of games in it is assumed to have increased,
+            spreading the chosen matchups over different players.
+        Args:
+            num_matchups (int): The number of matchups to schedule.
+        Returns: A list of tuples containing the names of the players in each matchup.
+        """
+        names = sorted(self.players)
+        chosen = []
+        pending = {}
+        for _ in range(num_matchups):
+            best, best_info = None, -1.0
+            for i, name_a in enumerate(names):
+                for name_b in names[i+1:]:
+                    info = self.information(name_a, name_b)/(1 + pending.get(self.key(name_a, name_b), 0))
+                    if info > best_info:
+                        best, best_info = (name_a, name_b), info
+            if best is None:
+                break
+            chosen.append(best)
+            pending[self.key(*best)] = pending.get(self.key(*best), 0) + 1
+        return chosen
+
+    def update(self, name_a, name_b, score_a, score_b):
+        """
+        Updates the ratings of two players after a single game. The player with the lower score wins the game.
+        Args:
+            name_a, name_b (String): The names of the players.
+            score_a, score_b (int): The final scores of the players in the game.
+        Returns: None
+        """
+        a, b = self.players[name_a], self.players[name_b]
+        result = 1.0 if score_a < score_b else (0.5 if score_a == score_b else 0.0)
+        change = K_FACTOR*(result - self.expected_score(a["rating"], b["rating"]))
+        a["rating"] += change
+        b["rating"] -= change
+        a["games"] += 1
+        b["games"] += 1
+        key = self.key(name_a, name_b)
+        self.matchups[key] = self.matchups.get(key, 0) + 1
+
+    def run(self, num_rounds, num_matchups, num_pairs, workers=None):
+        """
+        Plays rounds of the most informative matchups, updating the ratings after each game and saving the ladder after each round.
+        The matchups of a round are all played in parallel.
+        Args:
+            num_rounds (int): The number of rounds of matchups to play.
+            num_matchups (int): The number of matchups scheduled each round.
+            num_pairs (int): The number of pairs of games played in each matchup.
+            workers (int): The number of worker processes, one per CPU by default.
+        Returns: None
+        """
+        #The worker processes are kept for every round, so that each loads each player only once per run
+        executor = None if workers == 1 else ProcessPoolExecutor(workers)
+        try:
+            for _ in range(num_rounds):
+                matchups = self.schedule(num_matchups)
+                tasks, names = [], []
+                for name_a, name_b in matchups:
+                    for _ in range(num_pairs):
+                        seed = int(np.random.SeedSequence(self.seed, spawn_key=(self.num_played,)).generate_state(1)[0])
+                        self.num_played += 1
+                        tasks.append((self.spec(name_a), self.spec(name_b), seed))
+                        names.append((name_a, name_b))
+
+                for (name_a, name_b), games in zip(names, play_matchups(tasks, workers, executor)):
+                    for score_a, score_b in games:
+                        self.update(name_a, name_b, score_a, score_b)
+                self.save()
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+    def show(self):
+        """
+        Displays the rating and number of games of every player, from highest to lowest rating.
+        Returns: None
+        """
+        for name, p in sorted(self.players.items(), key=lambda item: -item[1]["rating"]):
+            print("%8.1f %6d  %s" % (p["rating"], p["games"], name))
+
+def player_name(flag, path):
+    """
+    Creates a readable, unique name for a player from its flag and path.
+    Args:
+        flag, path (String): The flag and path of the player, as given to extract_player.
+    Returns: A String name.
+    """
+    return "%s:%s" % (flag.lstrip('-'), os.path.normpath(path))
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument("ladder_path")
+    parser.add_argument("command", choices=["add", "run", "show"])
+    parser.add_argument("--coevo", action="append", default=[])
+    parser.add_argument("--neat", action="append", default=[])
+    parser.add_argument("--neat-generations", action="append", default=[])
+    parser.add_argument("--baselines", action="store_true")
+    parser.add_argument("--rounds", type=int, default=1)
+    parser.add_argument("--matchups", type=int, default=16)
+    parser.add_argument("--pairs", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args(sys.argv[1:])
+
+    ladder = Ladder(args.ladder_path)
+    if args.command == "add":
+        specs = [('-c', path) for path in args.coevo] + [('-n', path) for path in args.neat]
+        for run_dir in args.neat_generations:
+            specs += [('-n', path) for path in sorted(glob.glob(os.path.join(run_dir, "best_solutions", "generation-*")))]
+        if args.baselines:
+            specs += [('-r', "random"), ('-r', "greedy")]
+        for flag, path in specs:
+            ladder.add_player(player_name(flag, path), flag, path)
+        ladder.save()
+    elif args.command == "run":
+        ladder.run(args.rounds, args.matchups, args.pairs, args.workers)
+    ladder.show()
@@ -8,7 +8,6 @@ Args:
     DIR_PATH_SAVE (String): Second command line argument. The path to the directory where the game data will be saved.
 """
 import os
-from operator import add
 import sys
 import re
 import glob
@@ -16,6 +15,8 @@ import glob
 from golf import Golf, Golf_Analyser
 from player import Golf_Player, Random_Golf_Player, Greedy_Golf_Player
 import function_approximator as fa
+from compiled_network import Compiled_Network
+from game_log import Game_Log_Writer
 import pickle
 import neat
 
@@ -47,22 +48,13 @@ for gen_genome in gen_files:
     num_inputs = config.genome_config.num_inputs
     state_function = fa.one_hot_hand if num_inputs == 90 else (fa.one_hot_state_and_hand if num_inputs == 252 else fa.one_hot_state)
 
-    network = neat.nn.FeedForwardNetwork.create(genome, config)
+    network = Compiled_Network.create(genome, config)
     #Creates a player using the solution as a function approximator
     player = Golf_Player(state_function, fa.NEAT_Func_Approx(state_function, network))
 
     random_player = Random_Golf_Player()
 
-    RANDOM_GAMES = ["",""]
-    #Play the epoch of games
-    for n in range(5):
-        random_games = g.play_pair(player, random_player)
-        RANDOM_GAMES = list(map(add, RANDOM_GAMES, random_games))
-        RANDOM_GAMES[0]+='\n'
-        RANDOM_GAMES[1]+='\n'
-    
-    #Save the game data to file
-    filename = time.strftime("%Y%m%d-%H%M%S-", time.gmtime())
-    for i in range(2):
-        with open(os.path.join(DIR_PATH_SAVE, '%s%d-%d.txt' % (filename, generation, i)), 'w+') as f:
-            f.write(RANDOM_GAMES[i])
+    #Play the epoch of games, saving the games at each position to separate files
+    with Game_Log_Writer(DIR_PATH_SAVE, suffixes=("%d-0" % generation, "%d-1" % generation)) as log:
+        for n in range(5):
+            log.write(g.play_pair(player, random_player))
@@ -6,15 +6,15 @@ Args:
     DIR_PATH (String): First command line argument. The directory where the relevant NEAT files are located.
     DIR_PATH_SAVE (String): Second command line argument. The path to the directory where the game data will be saved.
 """
-import time
 import os
-from operator import add
 import sys
 import re
 
 from golf import Golf, Golf_Analyser
 from player import Golf_Player, Random_Golf_Player, Greedy_Golf_Player
 import function_approximator as fa
+from compiled_network import Compiled_Network
+from game_log import Game_Log_Writer
 import pickle
 import neat
 
@@ -41,25 +41,14 @@ config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
 num_inputs = config.genome_config.num_inputs
 state_function = fa.one_hot_hand if num_inputs == 90 else (fa.one_hot_state_and_hand if num_inputs == 252 else fa.one_hot_state)
 
-network = neat.nn.FeedForwardNetwork.create(genome, config)
+network = Compiled_Network.create(genome, config)
 #Creates a player using the solution as a function approximator
 player = Golf_Player(state_function, fa.NEAT_Func_Approx(state_function, network))
 
 random_player = Random_Golf_Player()
 
-RANDOM_GAMES = ["",""]
-#Play the games against the random player
-for n in range(2500):
-    random_games = g.play_pair(player, random_player)
-    RANDOM_GAMES = list(map(add, RANDOM_GAMES, random_games))
-    RANDOM_GAMES[0]+='\n'
-    RANDOM_GAMES[1]+='\n'
-
-    #Save the game data to file every 250 games (125 pairs)
-    if (n+1)%125 == 0:  
-        filename = time.strftime("%Y%m%d-%H%M%S-", time.gmtime())
-        #Saves games at each position to separate files
-        for i in range(2):
-            with open(os.path.join(DIR_PATH_SAVE, '%s%d.txt' % (filename, i)), 'w+') as f:
-                f.write(RANDOM_GAMES[i])
-        RANDOM_GAMES = ["",""]
+#Play the games against the random player, the games at each position are appended to separate files as they are played.
+#A new pair of files is started every 250 games (125 pairs)
+with Game_Log_Writer(DIR_PATH_SAVE, games_per_shard=125) as log:
+    for n in range(2500):
+        log.write(g.play_pair(player, random_player))
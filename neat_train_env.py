@@ -9,24 +9,242 @@ Args:
     DIR_PATH (String): First command line argument. The path of the directory where player files exist or are to be saved.
     STATE_FUNCTION (String): Second command line argument. The name of the function approximator used by the player.
         Must be one of either "one_hot_hand", "one_hot_state_and_hand", or "one_hot_state".
+    NUM_WORKERS (int): Optional third command line argument. The number of worker processes used to evaluate the solutions.
+        By default one, which evaluates the solutions in the main process. Larger values evaluate them with a pool of worker processes.
 """
 
 from __future__ import print_function
 import os
 import neat
 import numpy as np
-import copy
-from golf import Golf, Golf_Analyser
-from deck import Deck
+from compact_golf import Compact_Golf, Round_Result, deck_permutations, round_rngs
 from player import Golf_Player
+from compiled_network import Compiled_Network
+from game_log import Game_Log_Writer
 import function_approximator as fa
 import pickle
 import glob
 import sys
 import shutil
+import multiprocessing
+import hashlib
 
 NUM_FITNESS_GAMES = 10
 GENERATION = 0
+#Whether the game histories of the fitness games are recorded and saved to file
+SAVE_GAMES = True
+#The compression of the game files, one of None, "gzip", "lzma" or "zstd"
+GAME_LOG_COMPRESSION = None
+#The number of state values cached for each solution, shared by both copies over all of its fitness games
+STATE_CACHE_SIZE = 65536
+#Whether the solutions are raced, playing their fitness games in stages where solutions that cannot reach the top fraction stop playing
+RACING = False
+#The total number of games played by the end of each stage of a race, contenders that survive every stage play the final number
+RACE_SCHEDULE = (3, 6, 12, 20)
+#The fraction of the population that a solution must be able to reach to keep playing
+RACE_KEEP_FRACTION = 0.2
+#The number of standard errors either side of the mean fitness of a solution that are used as its confidence bounds
+RACE_CONFIDENCE = 1.0
+#How the scores of solutions carried over from the previous generation are reused, the solutions are not raced while this is set.
+#None: every solution plays new games. "fixed": every generation plays the same benchmark games, so a known solution reuses its fitness exactly.
+#"accumulate": a known solution plays the new games of the generation, which are added to its earlier games, up to FITNESS_CACHE_MAX_GAMES.
+FITNESS_CACHE_MODE = None
+#The seed of the benchmark games used by the "fixed" mode
+BENCHMARK_SEED = 0
+#The number of games after which a known solution stops playing in the "accumulate" mode
+FITNESS_CACHE_MAX_GAMES = 50
+#The scores of the solutions of the previous generation, keyed by the hash of their network and the evaluation protocol
+FITNESS_CACHE = {}
+
+#The parallel evaluator used by evaluate_solution, None if the solutions are evaluated in the main process
+EVALUATOR = None
+
+def evaluate_genome(genome, config, state_function, seeds, decks, save_games=False):
+    """
+    Plays the fitness games of a single solution against a copy of itself.
+    The result only depends on the solution and the seeds, so it is the same whichever process evaluates it.
+    Args:
+        genome (neat.DefaultGenome): The solution being evaluated.
+        config (neat.Config): The configuration of the parameters of the solutions.
+        state_function (function): The state function used by the players.
+        seeds (numpy.ndarray): A (num_games, 9) array of the seed of every round of the fitness games.
+        decks (numpy.ndarray): The deck of every round, as returned by deck_permutations(seeds).
+        save_games (bool): Whether the game histories of the fitness games are recorded.
+    Returns: A tuple of an array of the lowest score obtained by either copy in each game and a list of the history of each game,
+        an empty list if they are not recorded.
+    """
+    #Create a neural network from the solution and use it as a function approximator for both players
+    net = Compiled_Network.create(genome, config)
+    func_approx = fa.NEAT_Func_Approx(state_function, net)
+    func_approx.enable_cache(STATE_CACHE_SIZE)
+    player1 = Golf_Player(state_function, func_approx)
+    player2 = Golf_Player(state_function, func_approx)
+
+    golf = Compact_Golf()
+    scores = []
+    games = []
+    for game_num in range(len(seeds)):
+        #Plays a single game of Golf
+        results = []
+        for round_num in range(9):
+            #Sets the deck and random generators of the round from its seed
+            rng, player_rngs = round_rngs(seeds[game_num][round_num])
+            golf.initialise(decks[game_num][round_num])
+
+            results.append(golf.play_round_result(round_num, player1, player2, record_history=save_games,
+                                                    rng=rng, player_rngs=player_rngs))
+
+        scores.append(Round_Result.total_scores(results))
+        if save_games:
+            games.append("".join(result.history + '\n' for result in results))
+
+    return np.amin(scores, axis=1), games
+
+def fitness(min_scores):
+    """
+    Calculates the fitness of a solution from the average of the lowest score obtained by either copy over its fitness games.
+    This value is subtracted from 540 (the highest score) to determine the fitness value.
+    Args:
+        min_scores (numpy.ndarray): The lowest score of each fitness game, as returned by evaluate_genome.
+    Returns: The fitness value (float)
+    """
+    return (float)(540 - np.mean(min_scores))
+
+def genome_hash(genome, config):
+    """
+    Hashes the network expressed by a genome, its nodes, connections, weights and functions.
+    Genes that are disabled or cannot reach the output do not change the network, so do not change the hash.
+    Args:
+        genome (neat.DefaultGenome): The solution being hashed.
+        config (neat.Config): The configuration of the parameters of the solutions.
+    Returns: The hex digest of the hash (str)
+    """
+    net = neat.nn.FeedForwardNetwork.create(genome, config)
+    nodes = [(node, act_func.__name__, agg_func.__name__, bias, response, sorted(links))
+             for node, act_func, agg_func, bias, response, links in net.node_evals]
+    return hashlib.sha1(repr((net.input_nodes, net.output_nodes, sorted(nodes))).encode()).hexdigest()
+
+def play_cached(genomes, play, seeds, keys, accumulate):
+    """
+    Plays the fitness games of the solutions whose scores are not already known from the previous generation.
+    The scores of every solution are stored in FITNESS_CACHE, replacing the solutions of the previous generation.
+    Args:
+        genomes ([neat.DefaultGenome]): The solutions being evaluated.
+        play (function): Plays fitness games, given a list of solutions and the seeds of the games, returning the results of evaluate_genome for each.
+        seeds (numpy.ndarray): A (NUM_FITNESS_GAMES, 9) array of the seed of every round of the fitness games.
+        keys ([tuple]): The key of each solution in the cache, its hash and the evaluation protocol.
+        accumulate (bool): Whether known solutions play the games and add them to their earlier games, rather than reusing their scores.
+    Returns: A list of the lowest score of each game and the game histories of each solution, in the same order as the solutions.
+        Solutions which did not play any games have no game histories.
+    """
+    global FITNESS_CACHE
+    known = {key: FITNESS_CACHE[key] for key in keys if key in FITNESS_CACHE}
+    #Equal networks in the same generation are only played once
+    playing = {}
+    for k, key in enumerate(keys):
+        if key not in playing and (key not in known or (accumulate and len(known[key]) < FITNESS_CACHE_MAX_GAMES)):
+            playing[key] = k
+    played = dict(zip(playing, play([genomes[k] for k in playing.values()], seeds)))
+
+    results = []
+    for k, key in enumerate(keys):
+        scores, history = played.get(key, (np.zeros(0), []))
+        if key in known:
+            scores = np.append(known[key], scores)
+        results.append((scores, history if playing.get(key) == k else []))
+    FITNESS_CACHE = {key: scores for key, (scores, _) in zip(keys, results)}
+    return results
+
+def race(genomes, play, seeds):
+    """
+    Races the solutions, playing their fitness games in the stages given by RACE_SCHEDULE.
+    Every solution plays the same games in the same order. After each stage, the confidence bounds of the fitness of each solution are found
+        from the standard error of its games. Solutions whose upper bound is below the lower bound of the top RACE_KEEP_FRACTION stop playing.
+    The games saved on hopeless solutions are spent on the contenders, which play every stage.
+    Args:
+        genomes ([neat.DefaultGenome]): The solutions being raced.
+        play (function): Plays fitness games, given a list of solutions and the seeds of the games, returning the results of evaluate_genome for each.
+        seeds (numpy.ndarray): A (RACE_SCHEDULE[-1], 9) array of the seed of every round of the fitness games.
+    Returns: A list of the lowest score of each game played and the game histories of each solution, in the same order as the solutions.
+    """
+    keep = max(1, int(np.ceil(RACE_KEEP_FRACTION*len(genomes))))
+    min_scores = [np.zeros(0) for _ in genomes]
+    games = [[] for _ in genomes]
+    racing = list(range(len(genomes)))
+    played = 0
+    for stage, num_games in enumerate(RACE_SCHEDULE):
+        for k, (scores, history) in zip(racing, play([genomes[k] for k in racing], seeds[played:num_games])):
+            min_scores[k] = np.append(min_scores[k], scores)
+            games[k] += history
+        played = num_games
+
+        if stage < len(RACE_SCHEDULE) - 1 and len(racing) > keep:
+            means = np.array([fitness(min_scores[k]) for k in racing])
+            errors = RACE_CONFIDENCE*np.array([np.std(min_scores[k], ddof=1) for k in racing])/np.sqrt(played)
+            threshold = np.sort(means - errors)[-keep]
+            racing = [k for k, upper in zip(racing, means + errors) if upper >= threshold]
+
+    return list(zip(min_scores, games))
+
+#The state of each worker process, set once when the worker is started
+_WORKER = {}
+
+def _init_worker(config, state_function, save_games):
+    """
+    Stores the parameters shared by every evaluation in a worker process.
+    Args:
+        config (neat.Config): The configuration of the parameters of the solutions.
+        state_function (function): The state function used by the players.
+        save_games (bool): Whether the game histories of the fitness games are recorded.
+    Returns: None
+    """
+    _WORKER.update(config=config, state_function=state_function, save_games=save_games, seeds=None, decks=None)
+
+def _evaluate_task(task):
+    """
+    Evaluates a solution in a worker process.
+    The decks of a generation are only created once by each worker, the first time it sees the seeds of the generation.
+    Args:
+        task ((numpy.ndarray, neat.DefaultGenome)): The seeds of the generation and the solution being evaluated.
+    Returns: A tuple of the lowest score of each fitness game and the game histories.
+    """
+    seeds, genome = task
+    if _WORKER["seeds"] is None or not np.array_equal(_WORKER["seeds"], seeds):
+        _WORKER["seeds"], _WORKER["decks"] = seeds, deck_permutations(seeds)
+    return evaluate_genome(genome, _WORKER["config"], _WORKER["state_function"], seeds, _WORKER["decks"], _WORKER["save_games"])
+
+class Parallel_Evaluator():
+    """
+    Evaluates the solutions of a population with a pool of worker processes that is kept alive between generations.
+    The config and state function are sent to each worker once, when the pool is started.
+    Each generation only the seeds of the fitness games and the solutions are sent, and the scores and game histories are returned.
+    Attributes:
+        num_workers (int): The number of worker processes.
+        pool (multiprocessing.Pool): The pool of worker processes.
+    """
+    def __init__(self, num_workers, config, state_function, save_games=False):
+        self.num_workers = num_workers
+        self.pool = multiprocessing.Pool(num_workers, initializer=_init_worker, initargs=(config, state_function, save_games))
+
+    def evaluate(self, genomes, seeds):
+        """
+        Evaluates each solution with the fitness games of the generation.
+        Args:
+            genomes ([neat.DefaultGenome]): The solutions being evaluated.
+            seeds (numpy.ndarray): A (num_games, 9) array of the seed of every round of the fitness games.
+        Returns: A list of the results of evaluate_genome for each solution, in the same order as the solutions.
+        """
+        #Several solutions are sent at once to reduce the communication between processes
+        chunksize = max(1, len(genomes)//(4*self.num_workers))
+        return self.pool.map(_evaluate_task, [(seeds, genome) for genome in genomes], chunksize=chunksize)
+
+    def close(self):
+        """
+        Stops the worker processes once they have finished their work.
+        Returns: None
+        """
+        self.pool.close()
+        self.pool.join()
 
 def evaluate_solution(solutions, config):
     """
@@ -34,6 +252,9 @@ def evaluate_solution(solutions, config):
     Each solution is evaluated by playing 10 games against a copy of itself.
     Its fitness is calculated from the average of the lowest score obtained by either copy over the 10 games.
     This value is then subtracted from 540 (the highest score) to determine the fitness value.
+    If RACING is set, the solutions are instead raced and each fitness value is calculated from the games the solution played.
+    If FITNESS_CACHE_MODE is set, the scores of solutions that are unchanged from the previous generation are reused.
+    The solutions are evaluated by the EVALUATOR if one has been started, giving the same fitness values as evaluating them in this process.
     After each population has been evaluated, it saves the game data and the best solution at each generation.
     Args:
         solutions: All solutions in the current generation. 
@@ -44,40 +265,34 @@ def evaluate_solution(solutions, config):
     #Allows for the generation to be monitored for use when saving data to files.
     global GENERATION
 
-    #Generates the seeds and decks to be used in the fitness games
-    np.random.seed(None)
-    seeds = np.random.randint(0, 2147483648, size=(NUM_FITNESS_GAMES, 9))
-    decks = np.reshape([Deck(deck=[], jokers=True) for _ in range(9*NUM_FITNESS_GAMES)], (NUM_FITNESS_GAMES, 9))
-    
-    golf = Golf()
-    best = None
-    games =  ""
-    
-    for solution_id, solution in solutions:
-        #Create a neural network from the solution and use it as a function approximator for both players
-        net = neat.nn.FeedForwardNetwork.create(solution, config)
-        player1 = Golf_Player(STATE_FUNCTION, fa.NEAT_Func_Approx(STATE_FUNCTION, net))
-        player2 = copy.deepcopy(player1)
-
-        scores = []
-
-        for game_num in range(NUM_FITNESS_GAMES):
-            #Plays a single game of Golf
-            results = ""
-            for round_num in range(9):
-                #Sets the seed and deck of the round
-                np.random.seed(seeds[game_num][round_num])
-                golf.initialise(decks[game_num][round_num])
-
-                results += golf.play_round(round_num, player1, player2) + '\n'
+    def play(genomes, seeds):
+        #Plays the fitness games with the evaluator if one has been started, otherwise in this process
+        if EVALUATOR is not None:
+            return EVALUATOR.evaluate(genomes, seeds)
+        #The decks are shared, read only, by every solution
+        decks = deck_permutations(seeds)
+        return [evaluate_genome(genome, config, STATE_FUNCTION, seeds, decks, SAVE_GAMES) for genome in genomes]
 
-            scores.append(Golf_Analyser.extract_scores(results))
-            games += results + '\n'
+    #Generates the seeds to be used in the fitness games, each deck is determined by its seed
+    #The benchmark games are the same every generation
+    fixed = FITNESS_CACHE_MODE == "fixed"
+    num_games = RACE_SCHEDULE[-1] if RACING and FITNESS_CACHE_MODE is None else NUM_FITNESS_GAMES
+    seeds = np.random.default_rng(BENCHMARK_SEED if fixed else None).integers(0, 2147483648, size=(num_games, 9))
 
-        #The fitness calculation
-        min_mean_score = np.mean(np.amin(scores, axis=1))
-        solution.fitness = (float)(540 - min_mean_score)
+    genomes = [solution for _, solution in solutions]
+    if FITNESS_CACHE_MODE is not None:
+        #Scores can only be reused between evaluations with the same state function, games, and mode
+        protocol = (STATE_FUNCTION.__name__, NUM_FITNESS_GAMES, FITNESS_CACHE_MODE, BENCHMARK_SEED if fixed else None)
+        keys = [(genome_hash(genome, config), protocol) for genome in genomes]
+        results = play_cached(genomes, play, seeds, keys, not fixed)
+    elif RACING:
+        results = race(genomes, play, seeds)
+    else:
+        results = play(genomes, seeds)
 
+    best = None
+    for solution, (min_scores, _) in zip(genomes, results):
+        solution.fitness = fitness(min_scores)
         if best is None or solution.fitness > best.fitness:
             best = solution
     
@@ -85,10 +300,12 @@ def evaluate_solution(solutions, config):
     with open(DIR_PATH + "/best_solutions/generation-%d" % GENERATION, "wb+") as f:
         pickle.dump(best, f)
     
-    #Save the game files to the given directory
-    filename = time.strftime("%Y%m%d-%H%M%S-", time.gmtime())    
-    with open(DIR_PATH + "/game_files/%s%d.txt" % (filename, GENERATION), 'w+') as f:
-            f.write(games)
+    #Save the game file of the generation to the given directory
+    if SAVE_GAMES:
+        with Game_Log_Writer(DIR_PATH + "/game_files", suffixes=(GENERATION,), compression=GAME_LOG_COMPRESSION) as log:
+            for _, games in results:
+                for game in games:
+                    log.write([game])
     
     GENERATION += 1
 
@@ -101,6 +318,9 @@ def run(config_file):
         config_file (String): The path of the configuratio file being used
     Returns: None
     """
+    #Again, wish there was a better method of doing this. Allows for the generations number to be monitored.
+    global GENERATION, EVALUATOR
+
     #Load in the config file
     config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
                         neat.DefaultSpeciesSet, neat.DefaultStagnation,
@@ -125,12 +345,18 @@ def run(config_file):
     #Add reporter to make a checkpoint after every generation
     pop.add_reporter(neat.Checkpointer(1, None,filename_prefix=DIR_PATH + "/checkpoints/generation-"))
 
-    #Again, wish there was a better method of doing this. Allows for the generations number to be monitored.
-    global GENERATION
     if GENERATION >= 50:
         raise ValueError("Algorithm has already run for 50 generations")
 
-    winner = pop.run(evaluate_solution, 50-GENERATION)
+    #Start the worker processes once, they are reused by every generation
+    if NUM_WORKERS > 1:
+        EVALUATOR = Parallel_Evaluator(NUM_WORKERS, config, STATE_FUNCTION, SAVE_GAMES)
+    try:
+        winner = pop.run(evaluate_solution, 50-GENERATION)
+    finally:
+        if EVALUATOR is not None:
+            EVALUATOR.close()
+            EVALUATOR = None
     print('\nBest genome:\n{!s}'.format(winner))
 
 
@@ -159,6 +385,7 @@ if __name__ == '__main__':
         STATE_FUNCTION = fa.one_hot_state
     else:
         raise AttributeError("Input representation must be either one_hot_hand, one_hot_state_and_hand, or one_hot_state")
+    NUM_WORKERS = int(sys.argv[3]) if len(sys.argv) > 3 else 1
 
     #Copies the config file to the local directory of the run
     if not os.path.exists(os.path.join(DIR_PATH,"config-golf")):
@@ -13,15 +13,17 @@ class Neural_Network():
     Args:
         n_input, n_hidden, n_output (int): The number of nodes at the input, hidden, and output layers of the network. (> 0)
         W_hidden, W_output (numpy.ndarray): Arrays of the weights of the hidden and output layers respectively.
+        rng (numpy.random.Generator): The random generator the weights are drawn from. If None, the global numpy random state is used.
     """
-    def __init__(self, n_input, n_hidden, n_output):
+    def __init__(self, n_input, n_hidden, n_output, rng=None):
         self.n_input = n_input
         self.n_hidden = n_hidden
         self.n_output = n_output
 
         #Randomly initialise weights of the network such that each weight is independently drawn from a uniform distribution of [-1.0, 1.0).
-        self.W_hidden = np.random.uniform(-1.0, 1.0, (n_input+1, n_hidden)) #Adding one to the hidden weights to include hidden layer biases #np.zeros((n_input + 1, n_hidden))
-        self.W_output = np.random.uniform(-1.0, 1.0, (n_hidden, n_output)) #np.zeros((n_hidden, n_output)) #
+        rng = np.random if rng is None else rng
+        self.W_hidden = rng.uniform(-1.0, 1.0, (n_input+1, n_hidden)) #Adding one to the hidden weights to include hidden layer biases #np.zeros((n_input + 1, n_hidden))
+        self.W_output = rng.uniform(-1.0, 1.0, (n_hidden, n_output)) #np.zeros((n_hidden, n_output)) #
 
     def _sigmoid(self, x):
         """
@@ -43,4 +45,87 @@ class Neural_Network():
         inp = np.append(np.ones((data_in.shape[0], 1)), data_in, axis=1)
         hidden_out = self._sigmoid(np.dot(inp, self.W_hidden))
         output = np.dot(hidden_out, self.W_output)
-        return output
\ No newline at end of file
+        return output
+
+    def feedforward_delta(self, base_in, data_in):
+        """
+        Feed rows of data that each differ from a base input in only a few positions forwards through the neural network.
+        The input to the hidden layer is calculated for the base once,
+            then for each row only the weights of the inputs that differ from the base are added or subtracted.
+        A row equal to the base receives exactly the same input to the hidden layer as the base.
+        Args:
+            base_in (numpy.ndarray): The base input data, of shape (n_input,).
+            data_in (numpy.ndarray): The input data for the neural network, of shape (rows, n_input).
+        Returns: An array of floats representing the output of the neural network for each row
+        """
+        base_hidden = np.dot(np.append(1, base_in), self.W_hidden)
+
+        #Find the inputs of each row that differ from the base
+        flat = np.flatnonzero(data_in != base_in)
+        rows, cols = np.divmod(flat, self.n_input)
+        counts = np.bincount(rows, minlength=data_in.shape[0])
+        pos = np.arange(len(flat)) - np.repeat(np.cumsum(counts) - counts, counts)
+
+        #Pad the changes of each row to the same length, padding has no change and so adds nothing
+        changes = np.zeros((data_in.shape[0], counts.max(initial=0)))
+        weights = np.zeros(changes.shape, dtype=np.intp)
+        changes[rows, pos] = data_in.ravel()[flat] - base_in[cols]
+        #Offset by one to skip the weights of the hidden layer biases
+        weights[rows, pos] = cols + 1
+
+        hidden_in = base_hidden + np.einsum('mk,mkh->mh', changes, self.W_hidden[weights])
+        hidden_out = self._sigmoid(hidden_in)
+        output = np.dot(hidden_out, self.W_output)
+        return output
+
+    def feedforward_active(self, active):
+        """
+        Feed one hot input data, given as the indexes of the inputs which are one, forwards through the neural network.
+        The input to the hidden layer is the sum of the rows of W_hidden of the active inputs, avoiding the dense matrix multiplication.
+        Args:
+            active (numpy.ndarray): The indexes of the active inputs of each row of data, of shape (rows, k). Indexes of -1 are padding.
+        Returns: An array of floats representing the output of the neural network for each row
+        """
+        #Offset by one to skip the weights of the hidden layer biases
+        valid = active >= 0
+        if valid.all():
+            hidden_in = self.W_hidden[0] + self.W_hidden[active + 1].sum(axis=1)
+        else:
+            #Only the rows of the active inputs that are not padding are gathered, and are then summed for each row of data
+            counts = valid.sum(axis=1)
+            sums = np.zeros((active.shape[0], self.n_hidden))
+            nonempty = counts > 0
+            sums[nonempty] = np.add.reduceat(self.W_hidden[active[valid] + 1], (np.cumsum(counts) - counts)[nonempty], axis=0)
+            hidden_in = self.W_hidden[0] + sums
+        hidden_out = self._sigmoid(hidden_in)
+        output = np.dot(hidden_out, self.W_output)
+        return output
+
+    def feedforward_active_delta(self, base_active, active):
+        """
+        Feed one hot input data, given as the indexes of the inputs which are one, that differs from a base input in only a few positions forwards through the neural network.
+        The input to the hidden layer is the sum of the rows of W_hidden of the active inputs of the base, calculated once,
+            then for each row only the rows of W_hidden of the active inputs in the columns that differ from the base are added and subtracted.
+        A row equal to the base receives exactly the same input to the hidden layer as the base.
+        Args:
+            base_active (numpy.ndarray): The indexes of the active inputs of the base, of shape (k,). Indexes of -1 are padding.
+            active (numpy.ndarray): The indexes of the active inputs of each row of data, of shape (rows, k). Indexes of -1 are padding.
+        Returns: An array of floats representing the output of the neural network for each row
+        """
+        #Offset by one to skip the weights of the hidden layer biases, padding has no weights
+        base_hidden = self.W_hidden[0] + self.W_hidden[base_active[base_active >= 0] + 1].sum(axis=0)
+
+        #Find the columns of each row that differ from the base, adding the weights of the new input and subtracting those of the base input
+        rows, cols = np.nonzero(active != base_active)
+        added, removed = active[rows, cols], base_active[cols]
+        changes = (np.where((added >= 0)[:, None], self.W_hidden[added + 1], 0.0)
+                   - np.where((removed >= 0)[:, None], self.W_hidden[removed + 1], 0.0))
+
+        #Rows equal to the base are left with exactly the input of the base
+        hidden_in = np.tile(base_hidden, (active.shape[0], 1))
+        if len(rows):
+            starts = np.flatnonzero(np.diff(rows, prepend=-1))
+            hidden_in[rows[starts]] += np.add.reduceat(changes, starts, axis=0)
+        hidden_out = self._sigmoid(hidden_in)
+        output = np.dot(hidden_out, self.W_output)
+        return output
@@ -9,10 +9,10 @@ The Golf_player is the player that makes moves using a funtion approximator. Thi
 from abc import ABC, ABCMeta, abstractmethod
 
 import random
-import math
+import numpy as np
 from golf import Golf
 from actions import Actions
-from function_approximator import CoEvo_Func_Approx
+from function_approximator import CoEvo_Func_Approx, SUIT_INVARIANT_STATE_FUNCTIONS, HAND_VALUE_INPUTS
 from deck import Deck
 
 
@@ -33,24 +33,28 @@ class Player(ABC):
 
 
     @abstractmethod
-    def choose_draw(self, top_discard, game_state):
+    def choose_draw(self, top_discard, game_state, rng=None):
         """
         Given the state of the game and the card on top of the discard pile,
             the player decides whether to draw from the diacrd pile or the deck.
         Args:
             top_discard (Deck.Card): The top card of the discard pile
             game_state ([int]): The current game state
+            rng (numpy.random.Generator): The random generator used for any random decisions.
+                If None, the python random module is used.
         """
         pass
 
     @abstractmethod
-    def choose_discard(self, drawn_card, game_state):
+    def choose_discard(self, drawn_card, game_state, rng=None):
         """
         Given the state of the game and the card that has been drawn,
             the player decides what card they should discard.
         Args:
             top_discard (Deck.Card): The card drawn
             game_state ([int]): The current game state
+            rng (numpy.random.Generator): The random generator used for any random decisions.
+                If None, the python random module is used.
         """
         pass
 
@@ -62,10 +66,13 @@ class Golf_Player(Player):
         state_function (function): Converts the game state into a format suitable for the function approximator
         function_approximator (Func_Approx): The function approximator of the player that is used to evaluate game states.
     """
+    #The decision context of the current turn, set by choose_draw and discarded by choose_discard
+    _turn = None
+
     def __init__(self, state_function, function_approximator=None):
         super().__init__(state_function, function_approximator)
 
-    def choose_draw(self, top_discard, game_state):
+    def choose_draw(self, top_discard, game_state, rng=None):
         """
         Given the state of the game and the card on top of the discard pile,
             the player decides whether to draw from the diacrd pile or the deck.
@@ -76,30 +83,59 @@ class Golf_Player(Player):
         Args:
             top_discard (Deck.Card): The top card of the discard pile
             game_state ([int]): The current game state
+            rng (numpy.random.Generator): Not used, the decisions of the player are deterministic.
         Returns: The drawing location as an Action
         """
+        #Evaluate the exchanges of the discard, along with the current state, in a single batch
+        discard_index = state_index(top_discard)
+        discard_states = self.exchange_states(discard_index, game_state) + [game_state]
+        vals = self.function_approximator.value_of_states(discard_states, game_state)
+
         #Calculate the maximum value of the card and the current value of the game state
-        val_discard, _ = self.max_val_ind_exchange(Golf.get_card_index(top_discard), game_state)
-        val_current = self.function_approximator.value_of_state(game_state)
+        val_discard, val_current = vals[:6].max(), vals[-1]
 
-        #Draw from the deck if the card doesn't improve the hand
+        #Draw from the deck if the card doesn't improve the hand, without evaluating the unknown cards
         if val_current > val_discard:
+            #Keep the values of the exchanges of the discard for the discard decision of this turn
+            self._turn = (game_state[:], {discard_index: vals[:6]}, val_current)
             return Actions.DRAW_DECK
 
-        over, leq = 0, 0
-        for i in range(len(game_state)):
-            #Counts the number of unknwon cards that have a greater maxmimum value
-            if game_state[i] == -1: 
-                val, _ = self.max_val_ind_exchange(i, game_state)
-                if val > val_discard:
-                    over += 1
-                else:
-                    leq += 1
+        unknown = [i for i in range(len(game_state)) if game_state[i] == -1]
+        ranks = {}
+        if self.function_approximator.state_function in SUIT_INVARIANT_STATE_FUNCTIONS:
+            #Unknown cards of the same rank give the same inputs, so only one card of each rank is evaluated and counted by its multiplicity
+            for i in unknown:
+                ranks.setdefault(HAND_VALUE_INPUTS[i], []).append(i)
+            unknown = [cards[0] for cards in ranks.values()]
+            multiplicity = np.array([len(cards) for cards in ranks.values()])
+        else:
+            multiplicity = np.ones(len(unknown), dtype=int)
+
+        #Evaluate the exchanges of every unknown card in a single batch with the exchanges of the discard and the current state again,
+        #   as only the values of a single batch are exactly equal for equal inputs, which decides the ties between them
+        states = discard_states[:6]
+        for i in unknown:
+            states += self.exchange_states(i, game_state)
+        vals = self.function_approximator.value_of_states(states + [game_state], game_state)
+        val_discard, val_current = vals[:6].max(), vals[-1]
+
+        #Keep the values of every evaluated exchange for the discard decision of this turn, cards of the same rank share their values
+        exchanges = {discard_index: vals[:6]}
+        for k, i in enumerate(unknown):
+            exchanges[i] = vals[6*(k + 1):6*(k + 2)]
+        for cards in ranks.values():
+            for i in cards[1:]:
+                exchanges[i] = exchanges[cards[0]]
+        self._turn = (game_state[:], exchanges, val_current)
+
+        #Counts the number of unknwon cards that have a greater maxmimum value
+        over = int(multiplicity[vals[6:-1].reshape((len(unknown), 6)).max(axis=1) > val_discard].sum())
+        leq = int(multiplicity.sum()) - over
 
         #Draw from deck if there are more unknwon cards that are better, else draw from the deck
         return Actions.DRAW_DECK if over > leq else Actions.DRAW_DISCARD
 
-    def choose_discard(self, drawn_card, game_state):
+    def choose_discard(self, drawn_card, game_state, rng=None):
         """
         Given the state of the game and the card that has been drawn,
             the player decides what card they should discard.
@@ -109,17 +145,27 @@ class Golf_Player(Player):
         Args:
             top_discard (Deck.Card): The card drawn
             game_state ([int]): The current game state
+            rng (numpy.random.Generator): Not used, the decisions of the player are deterministic.
         Returns: The discarded card location as an Action
         """
-        
-        val, ind = self.max_val_ind_exchange(Golf.get_card_index(drawn_card), game_state)
+        #Reuse the values from choose_draw when the same game state is being decided on, the context only lasts for this turn
+        turn, self._turn = self._turn, None
+        card_index = state_index(drawn_card)
+        if turn is not None and turn[0] == game_state and card_index in turn[1]:
+            vals = np.append(turn[1][card_index], turn[2])
+        else:
+            #Evaluate every exchange of the card, along with the current state, in a single batch
+            states = self.exchange_states(card_index, game_state)
+            vals = self.function_approximator.value_of_states(states + [game_state], game_state)
+        ind = int(vals[:6].argmax())
+        val = vals[ind]
 
         #Prevent player from discarding card drawn from discard pile
-        if game_state[Golf.get_card_index(drawn_card)] == -2:
+        if game_state[card_index] == -2:
             index = ind
         else:
             #Check if card improves upon current hand
-            max_val = self.function_approximator.value_of_state(game_state)
+            max_val = vals[-1]
             index = ind if val > max_val else 8
 
         return Actions(index)
@@ -133,8 +179,20 @@ class Golf_Player(Player):
             game_state ([int]): The current game state
         Returns: A tuple containing the maximum value of the card and the index of exchanged card that results in that maximum value
         """
-        max_val, index = -math.inf, 0
+        vals = self.function_approximator.value_of_states(self.exchange_states(exchange_index, game_state), game_state)
+        #The first exchange with the maximum value is chosen
+        index = int(vals.argmax())
+        return vals[index], index
 
+    def exchange_states(self, exchange_index, game_state):
+        """
+        Creates the potential states obtained by exchanging a card with every card in the player's hand.
+        Args:
+            exchange_index (int): The index of the card that is being exchanged. Allows for easier manipulation of the game states.
+            game_state ([int]): The current game state
+        Returns: A list of the game states, one for each card in the player's hand.
+        """
+        states = []
         #Cycles over each card in the player's hand.
         for i, card in enumerate(self.hand):
             #Prevents game state from being overwritten
@@ -145,12 +203,20 @@ class Golf_Player(Player):
             #If the card is not hidden, then the player would known what card would go to the discard pile
             if ind is not None:
                 temp_state[ind] = -2
+            states.append(temp_state)
 
-            val = self.function_approximator.value_of_state(temp_state)
-            if val > max_val:
-                max_val, index = val, i
+        return states
 
-        return max_val, index
+    def copy_from(self, other_player):
+        """
+        Makes the player play identically to another player by copying the weights of its function approximator into the existing network.
+        This replaces copy.deepcopy of the other player, without allocating a new player or network.
+        Args:
+            other_player (Golf_Player): The player being copied, with a network of the same shape.
+        Returns: None
+        """
+        self.function_approximator.copy_from(other_player.function_approximator)
+        self._turn = None
 
     def update_network(self, opposing_player, crossover=0.05):
         """
@@ -164,15 +230,16 @@ class Golf_Player(Player):
         """
         self.function_approximator.update(opposing_player.function_approximator, crossover)
 
-    def add_noise(self, mean=0.0, sd=0.1):
+    def add_noise(self, mean=0.0, sd=0.1, rng=None):
         """
-        Adds Guassian noise to all weights in the nerual network via the numpy.random.normal method.
+        Adds Guassian noise to all weights in the nerual network, in place.
         Args:
             mean (float): The centre of the distribution. Default set to 0.0.
             sd (float): The standard deviation of the distribution. Default set to 0.1.
+            rng (numpy.random.Generator): The random generator of the noise. If None, the global numpy random state is used.
         Returns: None
         """
-        self.function_approximator.add_noise(mean, sd)
+        self.function_approximator.add_noise(mean, sd, rng)
 
 class Random_Golf_Player(Player):
     """
@@ -182,33 +249,35 @@ class Random_Golf_Player(Player):
     def __init__(self):
         super().__init__([], [])
 
-    def choose_draw(self, top_discard, game_state):
+    def choose_draw(self, top_discard, game_state, rng=None):
         """
         Decides randomly whether to draw from the deck or to draw from the discard pile.
-        It uses the choice method from the python random module.
+        It uses the given random generator, or the choice method from the python random module if none is given.
         The decision is returned as an instance of the Actions IntEnum class.
         Args:
             top_discard (Card): Not used.
             game_state ([int]): Not used.
+            rng (numpy.random.Generator): The random generator used to make the decision. None by default.
         Returns: An Actions object corresponding to the chosen draw location.
         """
-        return random.choice([Actions.DRAW_DECK, Actions.DRAW_DISCARD])
+        return random_choice([Actions.DRAW_DECK, Actions.DRAW_DISCARD], rng)
 
-    def choose_discard(self, drawn_card, game_state):
+    def choose_discard(self, drawn_card, game_state, rng=None):
         """
         Decides randomly which card in its hand to exchange with the drawn_card or whether to discard it.
-        It uses the choice method from the python random module.
+        It uses the given random generator, or the choice method from the python random module if none is given.
         The decision is returned as an instance of the Actions IntEnum class.
         Args:
             drawn_card (Card): Not used.
             game_state ([int]): Not used.
+            rng (numpy.random.Generator): The random generator used to make the decision. None by default.
         Returns: An Actions object corresponding to the card being discarded.
         """
         disc_options = [0,1,2,3,4,5]
         #Prevents the player discarding a card drawn from the discard pile
         if game_state[Golf.get_card_index(drawn_card)] != -2:
             disc_options += [8]
-        return Actions(random.choice(disc_options))
+        return Actions(random_choice(disc_options, rng))
 
 class Greedy_Golf_Player(Player):
     """
@@ -218,7 +287,7 @@ class Greedy_Golf_Player(Player):
     def __init__(self):
         super().__init__([], [])
 
-    def choose_draw(self, top_discard, game_state):
+    def choose_draw(self, top_discard, game_state, rng=None):
         """
         Decides whether to draw from the deck or the discard pile.
         If the card on the top of the discard pile scores more than 6, then the player chooses to draw from the deck.
@@ -227,20 +296,22 @@ class Greedy_Golf_Player(Player):
         Args:
             top_discard (Card): The card on top of the discard pile.
             game_state ([int]): Not used.
+            rng (numpy.random.Generator): Not used.
         Returns: An Actions object corresponding to the chosen draw location.
         """
         return Actions.DRAW_DECK if 6 < top_discard.get_val_suit()[0] < 13 else Actions.DRAW_DISCARD
 
-    def choose_discard(self, drawn_card, game_state):
+    def choose_discard(self, drawn_card, game_state, rng=None):
         """
         Decides which card in its hand to exchange with the drawn_card or whether to discard it.
         If there are any cards in the hand that score more than the drawn card, then the first card that scores more is exchanged.
         If the drawn card scores more than all visible cards in the hand, then it chooses from the remaining legal moves randomly.
-        This random decision is made using pythons random choice method.        
+        This random decision is made using the given random generator, or pythons random choice method if none is given.
         The decision is returned as an instance of the Actions IntEnum class.
         Args:
             drawn_card (Card): The card that has been drawn by the player.
             game_state ([int]): Not used.
+            rng (numpy.random.Generator): The random generator used to make the random decision. None by default.
         Returns: An Actions object corresponding to the card being discarded.
         """
         v, _ = drawn_card.get_val_suit()
@@ -254,4 +325,27 @@ class Greedy_Golf_Player(Player):
         if game_state[Golf.get_card_index(drawn_card)] != -2:
             disc_options += [8]
         #If no card scores more, choose from remaining legal moves randomly
-        return Actions(random.choice(disc_options))
+        return Actions(random_choice(disc_options, rng))
+
+def state_index(card):
+    """
+    Calculates the index of a card in the game state, with the jokers at 52 and 53 rather than the negative indexes from Golf.get_card_index.
+    Both refer to the same element of the game state, but only the non-negative index matches the index of an unknown card in the game state.
+    Args:
+        card (Deck.Card): The card, which must not be hidden.
+    Returns: The index of the card (int)
+    """
+    return Golf.get_card_index(card) % 54
+
+def random_choice(options, rng=None):
+    """
+    Chooses an element of options uniformly at random.
+    Args:
+        options (list): The options to choose from.
+        rng (numpy.random.Generator): The random generator used to make the choice.
+            If None, the choice method from the python random module is used.
+    Returns: The chosen element of options.
+    """
+    if rng is None:
+        return random.choice(options)
+    return options[rng.integers(len(options))]
@@ -0,0 +1,204 @@
+"""
+---population.py---
+Contains the Network_Population class, which holds many neural networks of the same shape as stacked 3-D weight arrays,
+    the vectorised policy that plays Batch_Golf with the members of a population, and an evolution strategies trainer.
+The trainer perturbs a central network to form the population, evaluates every member by playing games in lockstep,
+    and moves the central network in the direction of the perturbations that scored best.
+"""
+import numpy as np
+
+from neural_net import Neural_Network
+from function_approximator import CoEvo_Func_Approx, ACTIVE_STATE_FUNCTIONS, unique_rows
+from batch_golf import Batch_Golf, Value_Batch_Policy
+from player import Golf_Player
+
+class Network_Population():
+    """
+    Contains all methods and attributes to evaluate a population of K neural networks at once.
+    Every network has the same shape as a Neural_Network, a single hidden layer with biases and the sigmoid activation function.
+    Attributes:
+        size (int): The number of networks in the population, K.
+        n_input, n_hidden, n_output (int): The number of nodes at the input, hidden, and output layers of each network.
+        W_hidden (numpy.ndarray): A (K, n_input+1, n_hidden) array of the hidden layer weights of each network, including the biases.
+            A view of a tensor with a final row of zeros for each network, so it must be changed in place rather than reassigned.
+        W_output (numpy.ndarray): A (K, n_hidden, n_output) array of the output layer weights of each network.
+    """
+    def __init__(self, W_hidden, W_output):
+        W_hidden = np.asarray(W_hidden, dtype=float)
+        self.size, n_input, self.n_hidden = W_hidden.shape
+        self.n_input = n_input - 1
+        #The padding of the active inputs selects the final row of zeros, so the weights are never copied to add it
+        self._padded_hidden = np.zeros((self.size, n_input + 1, self.n_hidden))
+        self._padded_hidden[:, :-1] = W_hidden
+        self.W_hidden = self._padded_hidden[:, :-1]
+        self.W_output = np.asarray(W_output, dtype=float)
+        self.n_output = self.W_output.shape[2]
+
+    @staticmethod
+    def from_networks(networks):
+        """
+        Creates a population by copying the weights of each of the given networks.
+        Args:
+            networks ([Neural_Network]): The networks of the population, all of the same shape.
+        Returns: The population (Network_Population)
+        """
+        return Network_Population(np.stack([n.W_hidden for n in networks]), np.stack([n.W_output for n in networks]))
+
+    def network(self, k):
+        """
+        Creates a Neural_Network with a copy of the weights of a member of the population.
+        Args:
+            k (int): The index of the member of the population.
+        Returns: The network (Neural_Network)
+        """
+        network = Neural_Network(self.n_input, self.n_hidden, self.n_output)
+        network.W_hidden = self.W_hidden[k].copy()
+        network.W_output = self.W_output[k].copy()
+        return network
+
+    def _sigmoid(self, x):
+        """
+        Performs an element-wise sigmoid activation function on an array 'x'.
+        Args:
+            x (numpy.ndarray): An ndarray of float values.
+        Returns: An ndarray containing all sigmoid outputs.
+        """
+        return 1/(1 + np.exp(-x))
+
+    def feedforward_members(self, active, members):
+        """
+        Feed one hot input data, given as the indexes of the inputs which are one, forwards through a chosen member of the population for each row.
+        Args:
+            active (numpy.ndarray): The indexes of the active inputs of each row of data, of shape (M, k). Indexes of -1 are padding.
+            members (numpy.ndarray): The index of the member of the population that evaluates each row, of shape (M,).
+        Returns: A (M, n_output) array of the output of the chosen network for each row of data.
+        """
+        #Padding selects the final row of zeros of each network
+        weights = self._padded_hidden[:, 1:]
+        hidden_in = self.W_hidden[members, 0] + weights[members[:, None], active].sum(axis=1)
+        return np.einsum('mh,mho->mo', self._sigmoid(hidden_in), self.W_output[members])
+
+class Population_Batch_Policy(Value_Batch_Policy):
+    """
+    The vectorised policy of a population, where each round of the simulator is played by a chosen member of the population.
+    Decisions are made in the same manner as the Golf_Player.
+    Attributes:
+        population (Network_Population): The population of networks used to evaluate game states.
+        state_function (function): A state function with an active index equivalent, which converts the game states for the networks.
+        members (numpy.ndarray): The index of the member of the population that plays each round of the simulator.
+    """
+    def __init__(self, population, state_function, members):
+        self.population = population
+        self.state_function = state_function
+        self.members = np.asarray(members)
+
+    def values(self, states, rounds=None):
+        """
+        Evaluates each game state with the member of the population playing its round.
+        Each distinct state of each member is only evaluated once, so equal states always have exactly the same value.
+        Args:
+            states (numpy.ndarray): A (M, 54) array of game states.
+            rounds (numpy.ndarray): The round (row of the simulator) each state belongs to.
+        Returns: A (M,) array of the values of the states.
+        """
+        keys = np.concatenate([self.members[rounds][:, None], ACTIVE_STATE_FUNCTIONS[self.state_function](states)], axis=1)
+        first, inverse = unique_rows(keys)
+        return self.population.feedforward_members(keys[first, 1:], keys[first, 0])[:, 0][inverse]
+
+class ES_Trainer():
+    """
+    Trains a network with a simple evolution strategy.
+    Each generation the central network is perturbed with antithetic Gaussian noise to form the population.
+    Every member plays the same games against an opponent, the central network is then moved towards the perturbations
+        in proportion to the rank of their results.
+    The population and central network are updated in place.
+    Attributes:
+        network (Neural_Network): The central network being trained.
+        state_function (function): A state function with an active index equivalent, which converts the game states for the networks.
+        population (Network_Population): The perturbed copies of the central network.
+        sigma (float): The standard deviation of the perturbations.
+        learning_rate (float): The step size of the updates to the central network.
+        rng (numpy.random.Generator): The random generator used for the perturbations and games.
+    """
+    def __init__(self, network, state_function, size=20, sigma=0.1, learning_rate=0.05, rng=None):
+        if size % 2 != 0:
+            raise ValueError("The population size must be even for antithetic sampling")
+        if state_function not in ACTIVE_STATE_FUNCTIONS:
+            raise ValueError("The state function must have an active index equivalent")
+        self.network = network
+        self.state_function = state_function
+        self.sigma = sigma
+        self.learning_rate = learning_rate
+        self.rng = np.random.default_rng(rng)
+        self.population = Network_Population(np.zeros((size,) + network.W_hidden.shape), np.zeros((size,) + network.W_output.shape))
+        self._noise_hidden = np.zeros((size//2,) + network.W_hidden.shape)
+        self._noise_output = np.zeros((size//2,) + network.W_output.shape)
+
+    def perturb(self):
+        """
+        Draws new noise and sets the population to the central network plus and minus the scaled noise.
+        Returns: None
+        """
+        half = self.population.size//2
+        for noise, centre, weights in ((self._noise_hidden, self.network.W_hidden, self.population.W_hidden),
+                                       (self._noise_output, self.network.W_output, self.population.W_output)):
+            self.rng.standard_normal(out=noise)
+            np.multiply(noise, self.sigma, out=weights[:half])
+            np.negative(weights[:half], out=weights[half:])
+            weights += centre
+
+    def fitness(self, opponent, num_games):
+        """
+        Plays games of nine rounds between every member of the population and the opponent.
+        Every member plays the same decks, from both positions, reducing the noise between members.
+        Args:
+            opponent (Batch_Policy): The vectorised policy of the opponent.
+            num_games (int): The number of games each member plays in each position.
+        Returns: A (K,) array of the mean amount each member beat the opponent by per game.
+        """
+        K = self.population.size
+        members = np.repeat(np.arange(K), num_games)
+        sim = Batch_Golf(K*num_games, rng=self.rng)
+        policy = Population_Batch_Policy(self.population, self.state_function, members)
+
+        margins = np.zeros(K*num_games)
+        for r in range(9):
+            decks = np.tile(Batch_Golf.random_decks(num_games, self.rng), (K, 1))
+            #Play each deck with the member in both positions
+            scores, _ = sim.play([policy, opponent], r, decks=decks)
+            margins += scores[:, 1] - scores[:, 0]
+            scores, _ = sim.play([opponent, policy], r, decks=decks)
+            margins += scores[:, 0] - scores[:, 1]
+        return margins.reshape((K, num_games)).mean(axis=1)/2
+
+    def step(self, opponent, num_games):
+        """
+        Performs a single generation of the evolution strategy, updating the central network in place.
+        Args:
+            opponent (Batch_Policy): The vectorised policy of the opponent.
+            num_games (int): The number of games each member plays in each position.
+        Returns: A (K,) array of the fitness of each member of the population.
+        """
+        self.perturb()
+        fitness = self.fitness(opponent, num_games)
+
+        #Centred ranks are robust to the scale of the fitness, the antithetic pairs give the direction of each perturbation
+        K, half = self.population.size, self.population.size//2
+        ranks = np.empty(K)
+        ranks[np.argsort(fitness, kind='stable')] = np.arange(K)
+        utility = ranks/(K - 1) - 0.5
+        direction = utility[:half] - utility[half:]
+
+        scale = self.learning_rate/(K*self.sigma)
+        self.network.W_hidden += scale*np.tensordot(direction, self._noise_hidden, axes=1)
+        self.network.W_output += scale*np.tensordot(direction, self._noise_output, axes=1)
+        return fitness
+
+    def player(self):
+        """
+        Creates a Golf_Player which plays with the central network.
+        Returns: The player (Golf_Player)
+        """
+        func_approx = CoEvo_Func_Approx(self.network.n_hidden, self.state_function)
+        func_approx.network = self.network
+        return Golf_Player(self.state_function, func_approx)
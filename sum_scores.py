@@ -7,11 +7,11 @@ The statistics displayed are the mean score, the win percentage, the percetage o
 import time
 import os
 from operator import add
-import glob
 import numpy as np
 import itertools
 import sys
 from golf import Golf_Analyser
+from game_log import game_files, read_games
 
 scores = []
 hands = []
@@ -20,31 +20,27 @@ end = []
 
 DIR_PATH = sys.argv[1]
 #Finds paths of all texts files in the given directory
-files = glob.glob('%s/*.txt' % DIR_PATH)
+files = game_files(DIR_PATH)
 
 #Open the files in pairs which will allow for the games to be stored in chronological order of when they were played            
 pair_files = np.reshape(files, (len(files)//2, 2))
 for pair in pair_files:
             
     #Extract the scores, hands, turns, and number of rounds ended of the first file in the pair
-    with open(pair[0], 'r') as f0:
-        games_0 = f0.read().split('\n\n')[:-1]
-    for game in games_0:
-        scores.append(Golf_Analyser.extract_scores(game + '\n'))
-        hands += Golf_Analyser.extract_hands(game + '\n')
-        turns += Golf_Analyser.extract_number_of_turns(game + '\n')
-        end += Golf_Analyser.extract_rounds_ended(game + '\n')
+    for game in read_games(pair[0]):
+        scores.append(Golf_Analyser.extract_scores(game))
+        hands += Golf_Analyser.extract_hands(game)
+        turns += Golf_Analyser.extract_number_of_turns(game)
+        end += Golf_Analyser.extract_rounds_ended(game)
             
     #Extract the scores, hands, turns, and number of rounds ended of the first file in the pair
-    with open(pair[1], 'r') as f1:
-        games_1 = f1.read().split('\n\n')[:-1]
-    for game in games_1:
+    for game in read_games(pair[1]):
         #Reverses the data to account for the reversed player positions
-        scores.append(Golf_Analyser.extract_scores(game + '\n')[::-1])
-        tmp_hands = Golf_Analyser.extract_hands(game + '\n')
+        scores.append(Golf_Analyser.extract_scores(game)[::-1])
+        tmp_hands = Golf_Analyser.extract_hands(game)
         hands += [h[::-1] for h in tmp_hands]
-        turns += Golf_Analyser.extract_number_of_turns(game + '\n')
-        tmp_ends = Golf_Analyser.extract_rounds_ended(game + '\n')[0]
+        turns += Golf_Analyser.extract_number_of_turns(game)
+        tmp_ends = Golf_Analyser.extract_rounds_ended(game)[0]
         end += [tmp_ends[:-1][::-1] + tmp_ends[-1:]]
 
 
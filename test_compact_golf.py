@@ -0,0 +1,38 @@
+"""
+---test_compact_golf.py---
+Tests that the Compact_Golf engine plays exactly the same rounds as the Golf engine, with its maintained game states cross-checked against get_state.
+"""
+import random
+import unittest
+import numpy as np
+
+from golf import Golf
+from compact_golf import Compact_Golf
+from player import Golf_Player, Random_Golf_Player, Greedy_Golf_Player
+import function_approximator as fa
+
+class Test_Compact_Golf(unittest.TestCase):
+    def setUp(self):
+        np.random.seed(5)
+        self.players = [Golf_Player(fa.one_hot_hand), Golf_Player(fa.one_hot_state), Golf_Player(fa.one_hot_state_and_hand),
+                        Random_Golf_Player(), Greedy_Golf_Player()]
+
+    def play_round(self, engine, k, player1, player2):
+        """
+        Plays a round with the global random states seeded by the round, so that both engines shuffle and decide identically.
+        Returns: The history of the round (String)
+        """
+        random.seed(k)
+        np.random.seed(k)
+        engine.initialise()
+        return engine.play_round(k % 9, player1, player2)
+
+    def test_histories_match_golf(self):
+        golf, compact_golf = Golf(), Compact_Golf(debug=True)
+        for k in range(40):
+            a, b = random.Random(k).sample(range(len(self.players)), 2)
+            expected = self.play_round(golf, k, self.players[a], self.players[b])
+            self.assertEqual(self.play_round(compact_golf, k, self.players[a], self.players[b]), expected, "round %d" % k)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,56 @@
+"""
+---test_compiled_network.py---
+Tests that the Compiled_Network evaluates mutated NEAT genomes to the same outputs as the NEAT FeedForwardNetwork,
+    and that it rejects the nodes it cannot compile.
+"""
+import os
+import random
+import unittest
+import numpy as np
+import neat
+
+from compiled_network import Compiled_Network
+
+CONFIG_FILES = ['config-golf-90', 'config-golf-252', 'config-golf-486']
+
+def mutated_network(config_file, seed, mutations):
+    """
+    Creates a genome from a config file and mutates it, adding hidden nodes and connections.
+    Returns: The FeedForwardNetwork of the genome and its config (neat.nn.FeedForwardNetwork, neat.Config)
+    """
+    config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction, neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                         os.path.join(os.path.dirname(os.path.abspath(__file__)), config_file))
+    random.seed(seed)
+    genome = config.genome_type(0)
+    genome.configure_new(config.genome_config)
+    for _ in range(mutations):
+        genome.mutate(config.genome_config)
+    return neat.nn.FeedForwardNetwork.create(genome, config), config
+
+class Test_Compiled_Network(unittest.TestCase):
+    def test_matches_feed_forward_network(self):
+        for config_file in CONFIG_FILES:
+            for seed in range(5):
+                network, config = mutated_network(config_file, seed, 30*seed)
+                compiled = Compiled_Network.from_network(network)
+                inputs = (np.random.default_rng(seed).random((50, config.genome_config.num_inputs)) < 0.1).astype(float)
+                expected = np.array([network.activate(row.tolist()) for row in inputs])
+                np.testing.assert_allclose(compiled.activate_batch(inputs), expected, rtol=0, atol=1e-14)
+                np.testing.assert_allclose(compiled.activate(inputs[0].tolist()), expected[0], rtol=0, atol=1e-14)
+
+    def test_rejects_unsupported_aggregation(self):
+        network, _ = mutated_network(CONFIG_FILES[0], 1, 30)
+        node_evals = [(node, act, neat.aggregations.product_aggregation, bias, response, links)
+                      for node, act, _, bias, response, links in network.node_evals]
+        with self.assertRaises(ValueError):
+            Compiled_Network(network.input_nodes, network.output_nodes, node_evals)
+
+    def test_rejects_unsupported_activation(self):
+        network, _ = mutated_network(CONFIG_FILES[0], 1, 30)
+        node_evals = [(node, neat.activations.sin_activation, agg, bias, response, links)
+                      for node, _, agg, bias, response, links in network.node_evals]
+        with self.assertRaises(ValueError):
+            Compiled_Network(network.input_nodes, network.output_nodes, node_evals)
+
+if __name__ == '__main__':
+    unittest.main()
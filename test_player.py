@@ -0,0 +1,60 @@
+"""
+---test_player.py---
+Tests that the Golf_Player reuses the values evaluated by choose_draw in choose_discard of the same turn, including for the jokers.
+"""
+import unittest
+
+from deck import Deck
+from actions import Actions
+from player import Golf_Player
+from function_approximator import Func_Approx, one_hot_state
+
+class Counting_Func_Approx(Func_Approx):
+    """
+    A function approximator which values a game state by the number of cards known to be in the player's hand,
+        and counts the number of states it evaluates.
+    """
+    def __init__(self):
+        super().__init__(one_hot_state)
+        self.evaluated = 0
+
+    def evaluate_state(self, state):
+        self.evaluated += 1
+        return float(sum(1 for location in state if location >= 0))
+
+class Test_Golf_Player(unittest.TestCase):
+    def setUp(self):
+        self.player = Golf_Player(one_hot_state, Counting_Func_Approx())
+        self.player.hand = [Deck.Card(0, 0, hidden=True) for _ in range(6)]
+        #Every card is unknown apart from the five of clubs on top of the discard pile
+        self.game_state = [-1]*54
+        self.game_state[4] = -2
+
+    def draw_and_discard(self, drawn_card):
+        """
+        Plays the draw and discard decisions of a turn, the discard improving the hand so that the unknown cards are evaluated.
+        The card is drawn regardless of the draw decision.
+        Returns: The number of states evaluated by choose_discard
+        """
+        self.player.choose_draw(Deck.Card(5, 1, hidden=False), self.game_state[:])
+        evaluated = self.player.function_approximator.evaluated
+        self.player.choose_discard(drawn_card, self.game_state[:])
+        return self.player.function_approximator.evaluated - evaluated
+
+    def test_card_drawn_from_deck_reuses_values(self):
+        self.assertEqual(self.draw_and_discard(Deck.Card(9, 3, hidden=False)), 0)
+
+    def test_joker_drawn_from_deck_reuses_values(self):
+        self.assertEqual(self.draw_and_discard(Deck.Card(-1, -2, hidden=False)), 0)
+        self.assertEqual(self.draw_and_discard(Deck.Card(-1, -1, hidden=False)), 0)
+
+    def test_different_state_is_evaluated(self):
+        self.player.choose_draw(Deck.Card(5, 1, hidden=False), self.game_state[:])
+        evaluated = self.player.function_approximator.evaluated
+        self.game_state[8] = -2
+        self.assertEqual(self.player.choose_discard(Deck.Card(-1, -2, hidden=False), self.game_state[:]), Actions(0))
+        self.assertEqual(self.player.function_approximator.evaluated - evaluated, 7)
+        self.assertIsNone(self.player._turn)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,180 @@
+"""
+---tournament.py---
+Contains the methods to load saved players and to play a tournament of many pairs of games between two players in parallel.
+The pairs of games are farmed out to a pool of worker processes, each of which loads both players once.
+Every pair is played with a seed drawn deterministically from the seed of the tournament,
+    so the games played are the same regardless of the number of workers.
+Pairs of games between many different players can also be played in parallel, as used by the rating ladder.
+"""
+import os
+import glob
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import neat
+
+import player
+import function_approximator as fa
+from compact_golf import Compact_Golf, Round_Result
+from compiled_network import Compiled_Network
+
+def extract_player(flag, path):
+    """
+    Re-initialise the player given its directory and relevant flag.
+    Args:
+        flag (String):  Specifies the type of player in the player_path directory.
+            Allows for the player to be created correctly. Coevolution flag '-c', NEAT flag '-n', Random flag (includes greedier random) '-r'.
+        path (String):  The path fo the directory that contains the serialised players.
+            If the random or greedier random player is chosen, then the path is either random or greedy respectively.
+            For a NEAT player, the path can instead be a single solution file such as 'best_solutions/generation-10'.
+    Returns: The reinistialsed player (Player)
+    """
+    if flag == '-c':
+        #Load the coevolution player file
+        with open(os.path.join(path, "PLAYER_PICKLE.p"), 'rb') as f:
+            p = pickle.load(f)
+    elif flag == '-n':
+        #Load the NEAT player, the config file is in the run directory above the solution file if one is given
+        solution_file = path if os.path.isfile(path) else None
+        if solution_file is not None:
+            path = os.path.dirname(os.path.dirname(solution_file))
+        config = neat.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                        neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                        path+'/config-golf')
+
+        #Determine the state function from the config file
+        num_inputs = config.genome_config.num_inputs
+        state_function = fa.one_hot_hand if num_inputs == 90 else (fa.one_hot_state_and_hand if num_inputs == 252 else fa.one_hot_state)
+
+        #Find and load the most recent 'best solution'
+        if solution_file is None:
+            solutions = glob.glob(os.path.join(path, "best_solutions", "*"))
+            solution_file = max(solutions, key=os.path.getctime)
+        with open(solution_file, 'rb') as f:
+            genome = pickle.load(f)
+        net = Compiled_Network.create(genome, config)
+        p = player.Golf_Player(state_function, fa.NEAT_Func_Approx(state_function, net))
+    elif flag == '-r':
+        #Initialises the requestion random player
+        if path == "random":
+            p = player.Random_Golf_Player()
+        elif path == "greedy":
+            p = player.Greedy_Golf_Player()
+        else:
+            raise FileNotFoundError("Enter 'random' or 'greedy' for a -r flag")
+    else:
+        raise AttributeError("Unknown flag %s" % flag)
+    return p
+
+def pair_seeds(seed, num_pairs):
+    """
+    Generates the seed of each pair of games in a tournament.
+    Args:
+        seed (int): The seed of the tournament.
+        num_pairs (int): The number of pairs of games in the tournament.
+    Returns: A list of num_pairs integer seeds.
+    """
+    return np.random.SeedSequence(seed).generate_state(num_pairs).tolist()
+
+#The players and engine of a worker process, loaded once by _init_worker
+_WORKER = {}
+
+def _init_worker(player_specs):
+    """
+    Loads the players of the tournament into a worker process.
+    Args:
+        player_specs ([(String, String)]): The flag and path of each player, as given to extract_player.
+    Returns: None
+    """
+    _WORKER["players"] = [extract_player(flag, path) for flag, path in player_specs]
+    _WORKER["golf"] = Compact_Golf()
+
+def _play_pair(seed):
+    """
+    Plays a single pair of games between the players loaded into the worker process.
+    Args:
+        seed (int): The seed of the pair of games.
+    Returns: The game histories of both games in a list
+    """
+    return _WORKER["golf"].play_pair(*_WORKER["players"], seed=seed)
+
+def play_tournament(player_specs, num_pairs, seed=None, workers=None, chunksize=1):
+    """
+    Plays a tournament of pairs of games between two players, yielding the game histories of each pair as they are played.
+    The pairs are yielded in order, so the output of a tournament only depends on its seed.
+    If a single worker is requested then the games are played in the current process.
+    Args:
+        player_specs ([(String, String)]): The flag and path of both players, as given to extract_player.
+        num_pairs (int): The number of pairs of games to play.
+        seed (int): The seed of the tournament. If None, a random seed is used.
+        workers (int): The number of worker processes. If None, one worker is used per CPU.
+        chunksize (int): The number of pairs sent to a worker at once.
+    Returns: A generator of the game histories of each pair of games, as returned by Compact_Golf.play_pair.
+    """
+    seeds = pair_seeds(seed, num_pairs)
+    if workers == 1:
+        _init_worker(player_specs)
+        for s in seeds:
+            yield _play_pair(s)
+        return
+
+    with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(player_specs,)) as executor:
+        for games in executor.map(_play_pair, seeds, chunksize=chunksize):
+            yield games
+
+def _cached_player(spec, slot):
+    """
+    Loads a player into a worker process, keeping it for any later matchups it plays in.
+    A separate copy is kept for each position so that a player can play against itself.
+    Args:
+        spec ((String, String)): The flag and path of the player, as given to extract_player.
+        slot (int): The position of the player in the matchup.
+    Returns: The loaded player (Player)
+    """
+    cache = _WORKER.setdefault("cache", {})
+    key = (tuple(spec), slot)
+    if key not in cache:
+        cache[key] = extract_player(*spec)
+    return cache[key]
+
+def _play_matchup_pair(task):
+    """
+    Plays a single pair of games between any two players, loading them into the worker process if required.
+    Args:
+        task (((String, String), (String, String), int)): The specs of both players and the seed of the pair of games.
+    Returns: A list of the total scores of each game, both in the order of the players given.
+    """
+    spec1, spec2, seed = task
+    if "golf" not in _WORKER:
+        _WORKER["golf"] = Compact_Golf()
+    golf = _WORKER["golf"]
+    results = golf.play_pair_results(_cached_player(spec1, 0), _cached_player(spec2, 1), seed=seed)
+    scores_1 = Round_Result.total_scores(results[0])
+    scores_2 = Round_Result.total_scores(results[1])
+    #Reverse scores due to reversed positions
+    return [scores_1, scores_2[::-1]]
+
+def play_matchups(tasks, workers=None, executor=None):
+    """
+    Plays pairs of games between many different players in parallel, yielding the scores in the order of the tasks.
+    Each worker process loads each player once, the first time it is required.
+    Passing the same executor to every call keeps the players loaded by its workers, rather than loading them again for each call.
+    Args:
+        tasks ([((String, String), (String, String), int)]): The specs of both players and the seed of each pair of games.
+        workers (int): The number of worker processes. If None, one worker is used per CPU. If 1, the games are played in the current process.
+        executor (ProcessPoolExecutor): The executor the games are played with. If None, an executor is created for this call only.
+    Returns: A generator of the scores of each pair of games, as returned by _play_matchup_pair.
+    """
+    if workers == 1:
+        for task in tasks:
+            yield _play_matchup_pair(task)
+        return
+
+    if executor is not None:
+        for scores in executor.map(_play_matchup_pair, tasks):
+            yield scores
+        return
+
+    with ProcessPoolExecutor(workers) as executor:
+        for scores in executor.map(_play_matchup_pair, tasks):
+            yield scores